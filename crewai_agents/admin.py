@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SiteUser, Company, CompetitorTrend, PricingTier, Email, Outreach, AgentConfig, ToolConfig, AgentLog, ToolLog, AgentTask
+from .models import SiteUser, Company, DecisionMaker, CompetitorTrend, PricingTier, Email, Outreach, AgentConfig, ToolConfig, AgentLog, ToolLog, AgentTask, LLMCacheEntry, EmailFragment, SearchCacheEntry, SearchQueryLedger
 from unfold.admin import ModelAdmin
 from django.contrib import messages
 from django.utils.html import format_html
@@ -41,7 +41,7 @@ class PricingTierAdmin(ModelAdmin):
 
 """ Agent Config Admin """
 class AgentConfigAdmin(ModelAdmin):
-    list_display = ('name', 'agent_type', 'is_active', 'created_at')
+    list_display = ('name', 'agent_type', 'model_name', 'writer_model_name', 'is_active', 'updated_at')
     list_filter = ('agent_type', 'is_active')
     search_fields = ('name', 'description')
 
@@ -66,6 +66,42 @@ class AgentTaskAdmin(ModelAdmin):
     list_filter = ('status', 'agent_type')
     search_fields = ('agent_type',)
 
+""" LLM Cache Entry Admin """
+class LLMCacheEntryAdmin(ModelAdmin):
+    list_display = ('model_name', 'temperature', 'hit_count', 'last_accessed_at', 'expires_at')
+    list_filter = ('model_name',)
+    search_fields = ('prompt_hash',)
+
+""" Email Fragment Admin """
+class EmailFragmentAdmin(ModelAdmin):
+    list_display = ('industry', 'size_band', 'hit_count', 'created_at')
+    list_filter = ('size_band',)
+    search_fields = ('industry',)
+
+""" Search Cache Entry Admin """
+class SearchCacheEntryAdmin(ModelAdmin):
+    list_display = ('query', 'search_type', 'hit_count', 'last_accessed_at', 'expires_at')
+    list_filter = ('search_type',)
+    search_fields = ('query',)
+
+""" Search Query Ledger Admin """
+class SearchQueryLedgerAdmin(ModelAdmin):
+    list_display = ('agent_name', 'query', 'run_count', 'first_seen_at', 'last_run_at')
+    list_filter = ('agent_name',)
+    search_fields = ('query',)
+
+""" Decision Maker Admin """
+class DecisionMakerAdmin(ModelAdmin):
+    list_display = ('name', 'role', 'email', 'company')
+    list_select_related = ('company',)
+    search_fields = ('=email', 'name', 'role')
+    raw_id_fields = ('company',)
+
+admin.site.register(DecisionMaker, DecisionMakerAdmin)
+admin.site.register(LLMCacheEntry, LLMCacheEntryAdmin)
+admin.site.register(SearchQueryLedger, SearchQueryLedgerAdmin)
+admin.site.register(SearchCacheEntry, SearchCacheEntryAdmin)
+admin.site.register(EmailFragment, EmailFragmentAdmin)
 admin.site.register(AgentTask, AgentTaskAdmin)
 admin.site.register(AgentLog, AgentLogAdmin)
 admin.site.register(ToolConfig, ToolConfigAdmin)
@@ -1,30 +1,49 @@
 from django.contrib import admin
-from django.utils.html import format_html
+from django.db.models import Exists, OuterRef
+from django.utils.html import format_html, format_html_join
 from unfold.admin import ModelAdmin
 
+from ..models import DecisionMaker
+
+
+class HasContactsFilter(admin.SimpleListFilter):
+    title = "decision makers"
+    parameter_name = "has_contacts"
+
+    def lookups(self, request, model_admin):
+        return (("yes", "Has decision makers"), ("no", "No decision makers"))
+
+    def queryset(self, request, queryset):
+        # Indexed EXISTS on DecisionMaker.company instead of decoding the JSON of every row
+        has_contacts = Exists(DecisionMaker.objects.filter(company=OuterRef('pk')))
+        if self.value() == "yes":
+            return queryset.filter(has_contacts)
+        if self.value() == "no":
+            return queryset.filter(~has_contacts)
+        return queryset
+
+
 class CompanyAdmin(ModelAdmin):
     list_display = ('company_name', 'employee_size', 'industry', 'location', 
                    'website_url', 'priority_score', 'get_decision_makers_display')
-    search_fields = ('company_name', 'industry', 'location')
-    list_filter = ('industry', 'location')
+    search_fields = ('company_name', 'canonical_key', 'website_domain', 'industry', 'location', '=contacts__email')
+    list_filter = ('industry', 'location', HasContactsFilter)
     ordering = ('company_name',)
     list_per_page = 10
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('contacts')
+
     def get_decision_makers_display(self, obj):
         """Format decision makers as an HTML list"""
-        if not obj.decision_makers: 
+        contacts = obj.contacts.all()
+        if not contacts:
             return "No decision makers"
-            
-        dm_list = []
-        for dm in obj.decision_makers: 
-            dm_info = [
-                f"<strong>{dm.get('name', 'N/A')}</strong>",
-                f"Role: {dm.get('role', 'N/A')}",
-                f"Email: {dm.get('email', 'N/A')}",
-                f"Phone: {dm.get('phone', 'N/A')}"
-            ]
-            dm_list.append(" | ".join(dm_info))
-            
-        return format_html("<br>".join(dm_list))
+
+        return format_html_join(
+            format_html("<br>"),
+            "<strong>{}</strong> | Role: {} | Email: {} | Phone: {}",
+            ((dm.name or 'N/A', dm.role or 'N/A', dm.email or 'N/A', dm.phone or 'N/A') for dm in contacts),
+        )
     
-    get_decision_makers_display.short_description = "Decision Makers"
\ No newline at end of file
+    get_decision_makers_display.short_description = "Decision Makers"
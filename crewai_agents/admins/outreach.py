@@ -5,7 +5,7 @@ from unfold.admin import ModelAdmin
 class OutreachAdmin(ModelAdmin):
     list_display = ('company_name', 'get_email_preview', 'status')
     list_display_links =  ('company_name',)
-    search_fields = ('company__name', 'comments', 'email__name', 'email__subject', 'email__content')
+    search_fields = ('company__company_name', 'comments', 'email__name', 'email__subject', 'email__content')
     list_filter = ('outreach_date', 'status')
     ordering = ('-outreach_date',)
     list_per_page = 10
@@ -27,7 +27,7 @@ class OutreachAdmin(ModelAdmin):
 
     def company_name(self, obj):
         return obj.company.company_name if obj.company else '-'
-    company_name.admin_order_field = 'company__name'
+    company_name.admin_order_field = 'company__company_name'
     company_name.short_description = 'Company'
 
     def get_email_preview(self, obj):
@@ -7,3 +7,6 @@ class CrewaiAgentsConfig(AppConfig):
 
     def ready(self):
         import crewai_agents.signals.outreach
+        import crewai_agents.signals.contacts
+        # Connection metrics (restoring_minds.db.metrics) count from startup
+        import restoring_minds.db
@@ -1,2 +1,3 @@
-from configs.agents import market_researcher, business_researcher, decision_maker, outreach_specialist
-from configs.tasks import run_market_researcher_scheduled, run_business_researcher_scheduled, run_decision_maker_scheduled, run_outreach_specialist_scheduled
+from .registry import AGENT_NAMES, get_agent, reset_agents
+from .pipeline import DEFAULT_AGENT_INPUTS, Pipeline, Stage, build_agent_pipeline
+from .tasks import run_market_researcher_scheduled, run_business_researcher_scheduled, run_decision_maker_scheduled, run_outreach_specialist_scheduled
\ No newline at end of file
@@ -0,0 +1,65 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from django.apps import apps
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# Registry names whose AgentConfig.agent_type differs
+AGENT_TYPES = {"decision_maker": "decision_maker_identifier"}
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_TEMPERATURE = 0.7
+
+
+@dataclass(frozen=True)
+class AgentSettings:
+    """Model, prompt and tool settings an agent is built with."""
+
+    model_name: str = DEFAULT_MODEL
+    temperature: float = DEFAULT_TEMPERATURE
+    writer_model_name: str = ""
+    system_prompt: str = ""
+    tools: tuple = ()
+    version: Optional[datetime] = None
+
+    @property
+    def writer_model(self):
+        """Model for long-form writing; falls back to the tool-selection model."""
+        return self.writer_model_name or self.model_name
+
+
+def active_configs(name):
+    AgentConfig = apps.get_model('crewai_agents', 'AgentConfig')
+    return AgentConfig.objects.filter(agent_type=AGENT_TYPES.get(name, name), is_active=True).order_by('-updated_at')
+
+
+def config_version(name):
+    """updated_at of the active AgentConfig row for name (None when there is none)."""
+    try:
+        return active_configs(name).values_list('updated_at', flat=True).first()
+    except DatabaseError:
+        logger.warning("Could not read AgentConfig for %s, using defaults", name, exc_info=True)
+        return None
+
+
+def load_agent_settings(name):
+    """AgentSettings from the active AgentConfig row for name, or the defaults."""
+    try:
+        config = active_configs(name).first()
+    except DatabaseError:
+        logger.warning("Could not read AgentConfig for %s, using defaults", name, exc_info=True)
+        config = None
+    if config is None:
+        return AgentSettings()
+    return AgentSettings(
+        model_name=config.model_name or DEFAULT_MODEL,
+        temperature=config.temperature,
+        writer_model_name=config.writer_model_name,
+        system_prompt=config.system_prompt.strip(),
+        tools=tuple(config.tools or ()),
+        version=config.updated_at,
+    )
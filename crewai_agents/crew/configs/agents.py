@@ -1,36 +1,178 @@
 from langchain.agents import initialize_agent, AgentType
 from langchain_openai import ChatOpenAI 
-from tools import (CompanyUpdateTool, CompetitorTrendTool, OutreachLogTool, fetch_outreach_data_tool,
-                   fetching_pending_outreach_ids, fetch_companies_tool, update_decision_makers_tool
-                   )
-from langchain.tools import Tool
-from langchain_google_community import GoogleSearchAPIWrapper  
+from langchain_core.messages import SystemMessage
 from langchain_community.utilities import GoogleSerperAPIWrapper
+from dataclasses import replace
+from functools import lru_cache
 import os
+import logging
 from dotenv import load_dotenv
+from django.conf import settings
+from ..tools import (CompanyUpdateTool, CompetitorTrendTool, OutreachLogTool, fetch_outreach_data_tool,
+                   fetching_pending_outreach_ids, fetch_companies_tool, update_decision_makers_tool, check_known_company_tool,
+                   structured_counterpart, SearchResultCache, WebSearchTool, ModelRateLimiter, RateLimiter,
+                   ToolRateLimitHandler, MultiWebSearchTool, SerperAsyncClient, SearchCompactor, SearchLedger,
+                   TrendFlushHandler, TrendWriteBuffer
+                   )
+from .agent_config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, AgentSettings
+from .email_fragments import EmailFragmentCache
+from .llm_cache import DatabaseLLMCache
+from .outreach_batch import BatchOutreachWriter
+from .replay import cassette_chat_model, cassette_mode, cassette_search, reset_cassettes
+from .scratchpad import ScratchpadManager, fixed_prompt_tokens
+from .sharding import ShardedDecisionMaker
 
 load_dotenv()
 
-api_key = os.environ.get('OPENAI_API_KEY')
-serper_api_key = os.environ["SERPER_API_KEY"]
-llm = ChatOpenAI(temperature=0.7, model="gpt-4o-mini", max_tokens=4000, openai_api_key=api_key)
+logger = logging.getLogger(__name__)
+
+# Completions are cached in the database so re-runs and retries skip answered steps
+llm_cache = DatabaseLLMCache()
+# Search results are cached too; the prompts repeat near-identical queries every run
+search_cache = SearchResultCache()
+# Search observations are trimmed and de-duplicated across each agent run
+search_compactor = SearchCompactor()
+# Queries repeated from earlier runs only return results the agent has not reviewed yet
+search_ledger = SearchLedger()
+# ToolConfig.rate_limit is enforced per tool and model name, shared across workers through Redis
+rate_limiter = RateLimiter()
+tool_rate_limit_handler = ToolRateLimitHandler(rate_limiter)
+# Competitor trends are written in bulk per market research run, without repeats
+trend_buffer = TrendWriteBuffer()
+trend_flush_handler = TrendFlushHandler(trend_buffer)
+
+
+@lru_cache(maxsize=None)
+def get_llm(model_name=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    """Chat model shared per (model, temperature), created on first use so importing this module needs no API key."""
+    mode = cassette_mode()
+    if mode == "replay":
+        return cassette_chat_model(model_name=model_name)
+    llm = ChatOpenAI(temperature=temperature, model=model_name, max_tokens=4000,
+                     openai_api_key=os.environ.get('OPENAI_API_KEY'), cache=llm_cache,
+                     rate_limiter=ModelRateLimiter(rate_limiter, model_name))
+    return cassette_chat_model(llm) if mode == "record" else llm
+
+
+@lru_cache(maxsize=None)
+def get_search_wrapper():
+    """Shared Serper wrapper, created on first use so SERPER_API_KEY is only read when needed."""
+    params = dict(gl="us", hl="en", k=10)
+    if cassette_mode() == "off":
+        return GoogleSerperAPIWrapper(serper_api_key=os.environ["SERPER_API_KEY"], **params)
+    return cassette_search(serper_api_key=os.environ.get("SERPER_API_KEY"), **params)
+
+
+@lru_cache(maxsize=None)
+def get_search_client():
+    """Pooled async Serper connection shared by the multi_web_search tools."""
+    return SerperAsyncClient(get_search_wrapper().serper_api_key,
+                             max_connections=getattr(settings, "MULTI_SEARCH_MAX_QUERIES", 5))
+
+
+@lru_cache(maxsize=None)
+def get_web_search_tool(agent_name=""):
+    """web_search for one agent; the instances only differ in the agent their query ledger is kept for."""
+    return WebSearchTool(search=get_search_wrapper(), cache=search_cache, rate_limiter=rate_limiter,
+                         compactor=search_compactor, ledger=search_ledger, agent_name=agent_name)
+
+
+@lru_cache(maxsize=None)
+def get_multi_web_search_tool(agent_name=""):
+    """Searches several queries per step, concurrently over one pooled connection."""
+    return MultiWebSearchTool(
+        search=get_search_wrapper(),
+        client=get_search_client(),
+        cache=search_cache,
+        rate_limiter=rate_limiter,
+        max_queries=getattr(settings, "MULTI_SEARCH_MAX_QUERIES", 5),
+        compactor=search_compactor,
+        ledger=search_ledger,
+        agent_name=agent_name,
+        use_wrapper=cassette_mode() != "off",
+    )
+
+
+def reset_clients():
+    """Forget the shared chat models and search tools (e.g. after switching cassette mode)."""
+    if get_search_client.cache_info().currsize:
+        get_search_client().close()
+    get_llm.cache_clear()
+    get_search_wrapper.cache_clear()
+    get_search_client.cache_clear()
+    get_web_search_tool.cache_clear()
+    get_multi_web_search_tool.cache_clear()
+    reset_cassettes()
 
-# Web search tool
-search = GoogleSerperAPIWrapper(
-    serper_api_key=serper_api_key,
-    gl="us",
-    hl="en",
-    k=10
-)
 
-web_search_tool = Tool(
-    name="web_search",
-    description="Search the web for market trends, company info, or contacts.",
-    func=search.run
-)
+def select_tools(tools, config):
+    """Tools named in AgentConfig.tools (all of them when the row lists none)."""
+    if not config.tools:
+        return tools
+    selected = [tool for tool in tools if tool.name in config.tools]
+    unknown = set(config.tools) - {tool.name for tool in tools}
+    if unknown:
+        logger.warning("Ignoring unknown tools in AgentConfig: %s", ", ".join(sorted(unknown)))
+    if not selected:
+        logger.warning("AgentConfig enables none of %s, keeping all of them", [tool.name for tool in tools])
+        return tools
+    return selected
+
+
+def rate_limited(tools):
+    """Attach the rate limit callback to tools (the search tools limit their own cache misses)."""
+    for tool in tools:
+        if not isinstance(tool, (WebSearchTool, MultiWebSearchTool)) and tool_rate_limit_handler not in (tool.callbacks or []):
+            tool.callbacks = [*(tool.callbacks or []), tool_rate_limit_handler]
+    return tools
+
+
+def react_prefix(prompt):
+    """System prompt as a ZeroShotAgent prefix; braces are escaped because the prefix is a format template."""
+    escaped = prompt.strip().replace("{", "{{").replace("}", "}}")
+    return f"{escaped}\n\nYou have access to the following tools:"
+
+
+def build_agent(tools, prompt, config=AgentSettings(), max_iterations=100, callbacks=None):
+    """
+    Agent with the tools, system prompt and model of its AgentConfig. The agent loop
+    only picks tools and arguments, so it runs on config.model_name; the outreach
+    specialist, which writes emails, runs on config.writer_model instead (see
+    build_outreach_specialist). callbacks are attached to the executor and only
+    see its own run.
+    """
+    tools = select_tools(tools, config)
+    prompt = config.system_prompt or prompt
+    llm = get_llm(config.model_name, config.temperature)
+    scratchpad = ScratchpadManager()
+    if getattr(settings, "AGENT_MODE", "react") == "tools":
+        # OpenAI tool calling: database tools take typed arguments instead of text Action Inputs
+        executor = initialize_agent(
+            tools=rate_limited([structured_counterpart(tool) for tool in tools]),
+            llm=llm,
+            agent=AgentType.OPENAI_FUNCTIONS,
+            verbose=True,
+            agent_kwargs={"system_message": SystemMessage(content=prompt)},
+            max_iterations=max_iterations,
+            trim_intermediate_steps=scratchpad,
+            callbacks=callbacks,
+        )
+    else:
+        executor = initialize_agent(
+            tools=rate_limited(tools),
+            llm=llm,
+            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+            verbose=True,
+            handle_parsing_errors=True,
+            agent_kwargs={"prefix": react_prefix(prompt)},
+            max_iterations=max_iterations,
+            trim_intermediate_steps=scratchpad,
+            callbacks=callbacks,
+        )
+    scratchpad.prompt_tokens = fixed_prompt_tokens(executor.agent)
+    return executor
 
 # Market Researcher Agent
-market_researcher_tools = [web_search_tool, CompetitorTrendTool()]
 market_researcher_prompt = """
 You are a Market Researcher for a stress management service targeting Dalla Fort Worth,  companies.
 Research market trends, competitor offerings, and pricing in the stress management industry.
@@ -51,20 +193,17 @@ When using the web_search tool:
    - "Downtown Fort Worth"
    - "Las Colinas business district"
 
+4. To cover several queries in one step, pass them as a JSON list to the multi_web_search tool, e.g.
+   ["fast-growing companies in Dallas TX", "high-stress workplaces DFW area"]
+
 Only companies with headquarters or significant operations in the DFW region should be considered. Discard results for companies outside this geographic area.
 """
-market_researcher = initialize_agent(
-    tools=market_researcher_tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True,
-    prompt=market_researcher_prompt,
-    max_iterations=100,
-)
+def build_market_researcher(config=AgentSettings()):
+    return build_agent([get_web_search_tool("market_researcher"), get_multi_web_search_tool("market_researcher"),
+                        CompetitorTrendTool(buffer=trend_buffer)],
+                       market_researcher_prompt, config, callbacks=[trend_flush_handler])
 
 # Business Researcher Agent
-business_researcher_tools = [web_search_tool, CompanyUpdateTool()]
 business_researcher_prompt = """
 You are a highly skilled Business Researcher tasked with identifying and adding high-stress companies in the Dallas-Fort Worth (DFW) area to a database for potential stress management services. Your objective is to find and analyze fast-growing, high-stress companies headquartered in DFW, focusing on high-pressure industries like technology, finance, healthcare, manufacturing, and professional services.
 
@@ -84,8 +223,12 @@ This is NOT a generic research task about the role of a business researcher. Ins
      - "Downtown Fort Worth"
      - "Las Colinas business district"
    - Only consider companies with headquarters or significant operations in the DFW region. Discard results for companies outside this area.
+   - To cover several queries in one step, pass them as a JSON list to the multi_web_search tool, e.g.
+     ["fast-growing companies in Dallas TX", "tech startups in Plano with high turnover"]
 
 2. For each company identified:
+   - FIRST call check_known_company with its name (and website if you have it). If it is already known, skip it
+     and move on to the next candidate without researching it further.
    - Conduct thorough research using web_search to collect comprehensive data.
    - Gather ALL the following required fields:
      - company_name: Full legal name (string)
@@ -104,31 +247,27 @@ This is NOT a generic research task about the role of a business researcher. Ins
 3. Use the company_update tool to add each company to the database:
    - Format the data as a JSON dictionary with ALL the exact keys listed above.
    - Call company_update with the JSON dictionary for each company.
+   - When you have finished researching several companies, you may save them in one call by passing
+     a JSON list of these dictionaries to company_update.
    - Process one company fully (research and update) before moving to the next.
 
 Your task is to identify and add at least 5 different companies that match these criteria. Do NOT stop until you have successfully added 5 companies to the database using company_update. Be methodical and precise. The data you provide will be directly inserted into our database.
 
 Start by searching for candidate companies NOW. Do not research unrelated topics like the role of a business researcher.
 """
-business_researcher = initialize_agent(
-    tools=business_researcher_tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True,
-    prompt=business_researcher_prompt,
-    max_iterations=100,
-)
+def build_business_researcher(config=AgentSettings()):
+    return build_agent([get_web_search_tool("business_researcher"), get_multi_web_search_tool("business_researcher"),
+                        check_known_company_tool, CompanyUpdateTool()],
+                       business_researcher_prompt, config)
 
 # Decision-Maker Identifier Agent
-decision_maker_tools = [fetch_companies_tool, web_search_tool, update_decision_makers_tool]
 decision_maker_prompt = """
 You are a Decision-Maker Identifier tasked with finding key contacts (e.g., HR managers, CEOs) at target companies in the Dallas-Fort Worth (DFW) area and updating their decision_makers field in the database.
 Follow these EXACT steps for each company to ensure correct JSON output:
 
-1. Call fetch_companies_tool (ignore any input) to get a list of companies with no decision-makers. Output is a list of dicts with 'company_id', 'company_name', 'size', 'industry', 'location', 'decision_makers' (empty).
+1. Call fetch_companies_tool with no input to get the first page of companies with no decision-makers. Output is a dict with 'companies' (a list of dicts with 'company_id', 'company_name', 'size', 'industry', 'location') and 'next_after_id'.
 
-2. For EACH company in the list, ONE AT A TIME:
+2. For EACH company in the page, ONE AT A TIME:
    - Use web_search to find decision-makers on LinkedIn, Google, and Yahoo. Query: "{company_name} {industry} DFW decision makers HR managers CEOs site:linkedin.com | site:*.org | site:*.com -inurl:(signup | login)".
    - Collect data for at least one decision-maker with these EXACT fields:
      - "name": Full name (string)
@@ -163,23 +302,42 @@ Rules:
 - Process ONE company at a time: search, collect, update, then next.
 - Do NOT batch updates or use a list of companies; update_decision_makers_tool takes ONE company per call.
 - Ensure the JSON is PLAIN with NO extra quotes, escapes, or characters beyond the example.
-- Continue until ALL companies are updated or the list is exhausted.
+- When every company in the page is updated, call fetch_companies_tool with the page's next_after_id (e.g. 42) for the next page.
+- Continue until ALL companies are updated and next_after_id is null.
 - Start IMMEDIATELY with fetch_companies_tool.
 
 If update_decision_makers_tool fails, check the error and ensure the JSON matches the example EXACTLY without extra quotes or escapes.
 """
-decision_maker = initialize_agent(
-    tools=decision_maker_tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True,
-    prompt=decision_maker_prompt,
-    max_iterations=100,
-)
+# Sharded decision maker: one short run per batch of companies that are passed in the input
+decision_maker_shard_prompt = """
+You are a Decision-Maker Identifier finding key contacts (e.g., HR managers, CEOs) for the Dallas-Fort Worth (DFW) companies listed in your input, and saving them to the database.
+
+You only have two tools:
+- web_search: find decision-makers on LinkedIn, Google, and Yahoo.
+- update_decision_makers: save the decision-makers of ONE company per call.
+
+Rules:
+- Work only on the companies listed in the input; their company_id values are already known, there is nothing to fetch or paginate.
+- Process ONE company at a time: search, collect at least one decision-maker, then call update_decision_makers with a plain JSON string {"company_id": <int>, "decision_makers": [...]}.
+- Do NOT wrap the JSON in backticks, quotes or Markdown, and do not escape its quotes.
+- If update_decision_makers fails, fix the JSON according to the error and call it again.
+- Finish as soon as every listed company has been updated.
+"""
+def build_decision_maker(config=AgentSettings()):
+    if getattr(settings, "DECISION_MAKER_MODE", "agent") == "sharded":
+        batch_size = getattr(settings, "DECISION_MAKER_BATCH_SIZE", 1)
+        # Each batch only needs a search and an update per company; a configured system prompt
+        # describes the backlog-walking agent, so shard runs keep their own
+        shard_agent = build_agent([get_web_search_tool("decision_maker"), update_decision_makers_tool],
+                                  decision_maker_shard_prompt, replace(config, system_prompt=""),
+                                  max_iterations=max(10, 6 * batch_size))
+        return ShardedDecisionMaker(shard_agent, batch_size=batch_size,
+                                    max_workers=getattr(settings, "DECISION_MAKER_WORKERS", 4),
+                                    page_size=getattr(settings, "DECISION_MAKER_PAGE_SIZE", 25))
+    return build_agent([fetch_companies_tool, get_web_search_tool("decision_maker"), update_decision_makers_tool],
+                       decision_maker_prompt, config)
 
 # Outreach Specialist Agent
-outreach_tools = [fetching_pending_outreach_ids, fetch_outreach_data_tool, OutreachLogTool()]
 outreach_prompt = """
 You are an Outreach Specialist creating personalized email templates for DFW companies.
 
@@ -191,10 +349,10 @@ Your task is to process multiple outreach records by:
    - It will return a dictionary with 'count' and 'outreach_ids'
 
 ITERATION WORKFLOW:
-2. Fetch outreach and company data using fetch_outreach_data: tool to use - fetch_outreach_data_tool
-   - IMPORTANT: Provide ONLY the numeric outreach ID as input (e.g., fetch_outreach_data_tool(1))
-   - DO NOT use JSON format like { "outreach_id": 1 }
-   - This will return outreach details and associated company data including:
+2. Fetch outreach and company data for ALL pending IDs at once using fetch_outreach_data
+   - Provide the list of outreach IDs as input (e.g., [1, 2, 3]); a single numeric ID (e.g., 1) also works
+   - DO NOT call it once per ID; IDs listed under 'not_fetched' go in the next call
+   - This will return 'outreaches', one entry per record with outreach details and associated company data:
      outreach_id, outreach_status, company_id, company_name, industry, size, location, decision_makers
 
 3. Analyze the company profile from the fetched data:
@@ -222,12 +380,11 @@ ITERATION WORKFLOW:
        "recipient": "Primary decision maker's email address",
        "content": "Full email body with personalization"
      }
-   - status: "Ready" (to indicate the template is ready for sending)
 
 EXAMPLE PROCESS:
-For outreach ID 1:
-1. Call: fetch_outreach_data(1)
-   - This returns data for outreach ID 1 and its associated company
+For pending outreach IDs [1, 2]:
+1. Call: fetch_outreach_data([1, 2])
+   - This returns data for outreach IDs 1 and 2 and their associated companies
 2. Generate personalized email based on returned company data
 3. Update with: outreach_log({
      "outreach_id": 1,
@@ -236,19 +393,28 @@ For outreach ID 1:
        "subject": "Reducing Burnout in Your Finance Team",
        "content": "Dear [Decision Maker Name],..."
        "recipient": "HRs email address
-     },
-     "status": "Ready"
+     }
    })
-4. Move to next outreach ID and repeat
+4. Repeat steps 2-3 for outreach ID 2 with the data already fetched (no new fetch_outreach_data call)
 
 Process each outreach record thoroughly before moving to the next one.
 """
-outreach_specialist = initialize_agent(
-    tools=outreach_tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True,
-    prompt=outreach_prompt,
-    max_iterations=100,
-)
\ No newline at end of file
+def build_outreach_specialist(config=AgentSettings()):
+    if getattr(settings, "OUTREACH_MODE", "agent") == "batch":
+        # Batch mode is all long-form writing, so it runs on the writer model
+        writer = get_llm(config.writer_model, config.temperature)
+        fragments = EmailFragmentCache(writer) if getattr(settings, "OUTREACH_USE_FRAGMENTS", True) else None
+        return BatchOutreachWriter(writer, batch_size=getattr(settings, "OUTREACH_BATCH_SIZE", 20),
+                                   companies_per_call=getattr(settings, "OUTREACH_COMPANIES_PER_CALL", 5),
+                                   fragments=fragments)
+    # The agent writes each email into its outreach_log call, so its loop runs on the writer model too
+    return build_agent([fetching_pending_outreach_ids, fetch_outreach_data_tool, OutreachLogTool()],
+                       outreach_prompt, replace(config, model_name=config.writer_model))
+
+
+AGENT_BUILDERS = {
+    "market_researcher": build_market_researcher,
+    "business_researcher": build_business_researcher,
+    "decision_maker": build_decision_maker,
+    "outreach_specialist": build_outreach_specialist,
+}
@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import re
+import threading
+
+from django.apps import apps
+from django.db.models import F
+from langchain_core.output_parsers import JsonOutputParser
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_PROMPT = """You write reusable paragraphs for outreach emails from a stress management service
+(Restoring Minds Wellness) to companies in the Dallas-Fort Worth area.
+
+Target: {industry} companies with {size_band} employees.
+
+Write two short paragraphs that fit ANY company in this segment (no company names, no greetings):
+- "pain_points": the industry-specific stress and burnout pain points and how our services address them
+- "value_proposition": a clear value proposition with the potential ROI for a company of this size
+
+Respond with ONLY a JSON object with the keys "pain_points" and "value_proposition"."""
+
+# Prompt changes produce a new hash, so fragments written by an older prompt are never served
+PROMPT_HASH = hashlib.sha256(FRAGMENT_PROMPT.encode("utf-8")).hexdigest()
+
+# Used when no PricingTier covers a company's employee count
+FALLBACK_BANDS = ((1, 50), (51, 250), (251, 1000))
+
+
+def normalize_industry(industry):
+    return re.sub(r"\s+", " ", (industry or "").strip().lower()) or "general"
+
+
+def size_band(employee_size, tiers):
+    """Employee range of the matching PricingTier, or of a fallback band."""
+    size = employee_size or 0
+    for tier in tiers:
+        if tier.min_employees <= size <= tier.max_employees:
+            return f"{tier.min_employees}-{tier.max_employees}"
+    for low, high in FALLBACK_BANDS:
+        if low <= size <= high:
+            return f"{low}-{high}"
+    return f"{FALLBACK_BANDS[-1][1] + 1}+"
+
+
+class EmailFragmentCache:
+    """
+    Memoizes the pain-point and value-proposition paragraphs per (industry, size band)
+    in the EmailFragment table, so they are generated by the LLM once per segment and
+    prompt version instead of once per email.
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.parser = JsonOutputParser()
+        self._memo = {}
+        self._tiers = None
+        self._lock = threading.Lock()
+
+    def band_for(self, employee_size):
+        if self._tiers is None:
+            self._tiers = list(apps.get_model('crewai_agents', 'PricingTier').objects.all())
+        return size_band(employee_size, self._tiers)
+
+    def get(self, industry, employee_size):
+        """Return {"pain_points": ..., "value_proposition": ...} for the company's segment."""
+        key = (normalize_industry(industry), self.band_for(employee_size))
+        fragment = self._memo.get(key)
+        if fragment is not None:
+            return fragment
+
+        with self._lock:
+            fragment = self._memo.get(key)
+            if fragment is None:
+                fragment = self._load(*key) or self._generate(*key)
+                self._memo[key] = fragment
+        return fragment
+
+    def _load(self, industry, band):
+        EmailFragment = apps.get_model('crewai_agents', 'EmailFragment')
+        fragments = EmailFragment.objects.filter(industry=industry, size_band=band, prompt_hash=PROMPT_HASH)
+        fragment = fragments.values('pain_points', 'value_proposition').first()
+        if fragment is not None:
+            fragments.update(hit_count=F('hit_count') + 1)
+        return fragment
+
+    def _generate(self, industry, band):
+        EmailFragment = apps.get_model('crewai_agents', 'EmailFragment')
+        data = self.parser.parse(self.llm.invoke(FRAGMENT_PROMPT.format(industry=industry, size_band=band)).content)
+        fragment = {
+            'pain_points': str(data['pain_points']).strip(),
+            'value_proposition': str(data['value_proposition']).strip(),
+        }
+        # Drop fragments written by previous prompt versions for this segment
+        EmailFragment.objects.filter(industry=industry, size_band=band).exclude(prompt_hash=PROMPT_HASH).delete()
+        EmailFragment.objects.update_or_create(
+            industry=industry, size_band=band, prompt_hash=PROMPT_HASH, defaults=fragment,
+        )
+        logger.info("Generated email fragments for %s (%s employees)", industry, band)
+        return fragment
@@ -0,0 +1,61 @@
+import hashlib
+import json
+import re
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from ..tools.db_cache import DatabaseCache
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _sha256(value):
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so cosmetic prompt differences share a cache entry."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def parse_llm_string(llm_string):
+    """Extract (model_name, temperature) from the llm_string LangChain passes to caches."""
+    head = llm_string.split("---", 1)[0]
+    try:
+        kwargs = json.loads(head).get("kwargs", {})
+    except (ValueError, AttributeError):
+        return "", None
+    return kwargs.get("model_name") or kwargs.get("model", ""), kwargs.get("temperature")
+
+
+class DatabaseLLMCache(DatabaseCache, BaseCache):
+    """
+    Persistent LangChain cache backed by the LLMCacheEntry table.
+
+    Entries are keyed on model, temperature, the remaining call parameters and a
+    whitespace-normalized prompt hash. Expiry and the LLM_CACHE_MAX_ENTRIES soft cap
+    are handled by DatabaseCache.
+    """
+
+    entry_model = "LLMCacheEntry"
+    value_field = "response"
+    setting_prefix = "LLM_CACHE"
+    label = "LLM cache"
+
+    def make_key(self, prompt, llm_string):
+        """Return (key, model_name, temperature, prompt_hash) for a prompt/llm_string pair."""
+        model_name, temperature = parse_llm_string(llm_string)
+        prompt_hash = _sha256(normalize_prompt(prompt))
+        key = _sha256(f"{model_name}|{temperature}|{_sha256(llm_string)}|{prompt_hash}")
+        return key, model_name, temperature, prompt_hash
+
+    def lookup(self, prompt, llm_string):
+        key, _, _, _ = self.make_key(prompt, llm_string)
+        return self.fetch(key, lambda response: [loads(generation) for generation in response])
+
+    def update(self, prompt, llm_string, return_val):
+        key, model_name, temperature, prompt_hash = self.make_key(prompt, llm_string)
+        self.store(key, [dumps(generation) for generation in return_val],
+                   model_name=model_name or "", temperature=temperature, prompt_hash=prompt_hash)
@@ -0,0 +1,197 @@
+import json
+import logging
+import uuid
+
+from django.apps import apps
+from django.db import transaction
+from langchain_core.output_parsers import JsonOutputParser
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE = "Restoring Minds Wellness Staff, 717 W. Main St. ,Midlothian, TX 76065, 214-235-9087"
+
+BATCH_EMAIL_PROMPT = """You are an Outreach Specialist creating personalized email templates for DFW companies
+on behalf of a stress management service.
+
+For EACH company below write one email addressed to its primary decision maker with:
+- a brief, descriptive template name (e.g. "Tech Growth Outreach - [Company]")
+- an attention-grabbing subject line personalized to the company's industry/needs
+- the primary decision maker's email address as recipient (null if unknown)
+- a body with: a personalized greeting, a brief introduction to our stress management services,
+  industry-specific pain points and how we address them, a clear value proposition with potential ROI,
+  a specific call-to-action and the signature: {signature}
+
+Companies (JSON):
+{companies}
+
+Respond with ONLY a JSON array, one object per company, each with the keys
+"outreach_id", "name", "subject", "recipient" and "content"."""
+
+# With fragments, the LLM only writes what is specific to each company
+PERSONALIZATION_PROMPT = """You are an Outreach Specialist personalizing outreach emails from a stress management
+service to DFW companies. The service introduction, industry pain points, value proposition and
+signature are already written.
+
+For EACH company below write only:
+- "name": a brief, descriptive template name (e.g. "Tech Growth Outreach - [Company]")
+- "subject": an attention-grabbing subject line personalized to the company's industry/needs
+- "recipient": the primary decision maker's email address (null if unknown)
+- "greeting": the greeting line addressed to the primary decision maker
+- "hook": one or two sentences on why we are reaching out to this specific company
+
+Companies (JSON):
+{companies}
+
+Respond with ONLY a JSON array, one object per company, each with the keys
+"outreach_id", "name", "subject", "recipient", "greeting" and "hook"."""
+
+SERVICE_INTRO = ("Restoring Minds Wellness helps growing teams manage stress and build emotional "
+                 "intelligence through on-site and virtual workshops, coaching and wellness programs.")
+
+CALL_TO_ACTION = ("Would you be open to a brief 15-minute call next week to explore what this could "
+                  "look like for your team?")
+
+
+def primary_contact(decision_makers):
+    if isinstance(decision_makers, list) and decision_makers and isinstance(decision_makers[0], dict):
+        return decision_makers[0]
+    return {}
+
+
+class BatchOutreachWriter:
+    """
+    Drop-in replacement for the outreach_specialist agent. Pending Outreach rows are
+    loaded with their companies in one query per batch, emails for several companies
+    are generated per LLM call, and the resulting Email rows are created and linked
+    with bulk operations instead of one tool round trip per prospect. Outreach rows
+    the LLM returned no usable draft for stay pending and are counted as failed.
+    """
+
+    # run() takes the AgentTask id as run metadata, like the LangChain executors (see tasks.run_agent)
+    takes_metadata = True
+
+    def __init__(self, llm, batch_size=20, companies_per_call=5, fragments=None):
+        self.llm = llm
+        self.fragments = fragments
+        self.batch_size = batch_size
+        self.companies_per_call = max(1, companies_per_call)
+        self.parser = JsonOutputParser()
+
+    def pending_batches(self):
+        Outreach = apps.get_model('crewai_agents', 'Outreach')
+        last_id = 0
+        while True:
+            batch = list(
+                Outreach.objects.filter(status='pending', company__isnull=False, outreach_id__gt=last_id)
+                .select_related('company')
+                .order_by('outreach_id')[:self.batch_size]
+            )
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1].outreach_id
+
+    def run(self, input_data=None, metadata=None):
+        # Stored on each outreach it links, as OutreachLogTool does for agent runs
+        task_id = (metadata or {}).get("agent_task_id")
+        run_key = f"task:{task_id}" if task_id is not None else f"run:{uuid.uuid4()}"
+        created, failed = 0, 0
+        for batch in self.pending_batches():
+            for start in range(0, len(batch), self.companies_per_call):
+                chunk = batch[start:start + self.companies_per_call]
+                try:
+                    linked = self.persist(chunk, self.generate(chunk), run_key)
+                    created += linked
+                    failed += len(chunk) - linked
+                except Exception as e:
+                    logger.exception("Batch email generation failed for outreach %s",
+                                     [outreach.outreach_id for outreach in chunk])
+                    failed += len(chunk)
+        if not created and not failed:
+            return "No outreach records with pending status found."
+        return f"Generated {created} outreach emails ({failed} outreach records failed)."
+
+    def generate(self, outreaches):
+        """One LLM call for all outreaches; returns the drafts keyed by outreach_id."""
+        companies = []
+        for outreach in outreaches:
+            company = outreach.company
+            contact = primary_contact(company.decision_makers)
+            companies.append({
+                'outreach_id': outreach.outreach_id,
+                'company_name': company.company_name,
+                'industry': company.industry,
+                'size': company.employee_size,
+                'location': company.location,
+                'primary_decision_maker': {key: contact.get(key) for key in ('name', 'role', 'email')},
+            })
+        if self.fragments is None:
+            prompt = BATCH_EMAIL_PROMPT.format(signature=SIGNATURE, companies=json.dumps(companies))
+        else:
+            prompt = PERSONALIZATION_PROMPT.format(companies=json.dumps(companies))
+        drafts = self.parser.parse(self.llm.invoke(prompt).content)
+        if isinstance(drafts, dict):
+            drafts = [drafts]
+        drafts = {int(draft['outreach_id']): draft for draft in drafts if isinstance(draft, dict) and 'outreach_id' in draft}
+
+        if self.fragments is not None:
+            for outreach in outreaches:
+                draft = drafts.get(outreach.outreach_id)
+                if draft and draft.get('greeting'):
+                    draft['content'] = self.compose(outreach.company, draft)
+        return drafts
+
+    def compose(self, company, draft):
+        """Assemble the email body from the personalized parts and the cached segment fragments."""
+        fragment = self.fragments.get(company.industry, company.employee_size)
+        paragraphs = [
+            draft['greeting'],
+            draft.get('hook') or "",
+            SERVICE_INTRO,
+            fragment['pain_points'],
+            fragment['value_proposition'],
+            CALL_TO_ACTION,
+            f"Best regards,\n{SIGNATURE}",
+        ]
+        return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+    def persist(self, outreaches, drafts, run_key=None):
+        """
+        Link an Email to each drafted outreach and return how many were linked.
+        Emails already stored with the same subject, recipient and content are
+        reused; the rest are created in one bulk insert, and the outreaches are
+        updated (email, status and the run's idempotency key) in one bulk update.
+        """
+        Email = apps.get_model('crewai_agents', 'Email')
+        Outreach = apps.get_model('crewai_agents', 'Outreach')
+        from ...models.models import email_content_hash
+
+        linked = []
+        emails = {}
+        for outreach in outreaches:
+            draft = drafts.get(outreach.outreach_id)
+            if not draft or not draft.get('content'):
+                continue
+            company_name = outreach.company.company_name
+            email = Email(
+                name=(draft.get('name') or f"Email for {company_name}")[:100],
+                recipient=draft.get('recipient') or None,
+                subject=(draft.get('subject') or f"Introduction to {company_name}")[:200],
+                content=draft['content'],
+                is_active=True,
+                is_default=True,
+            )
+            # bulk_create skips save(), so the hash is set here
+            email.content_hash = email_content_hash(email.subject, email.recipient, email.content)
+            emails.setdefault(email.content_hash, email)
+            linked.append((outreach, email.content_hash))
+
+        with transaction.atomic():
+            stored = Email.objects.in_bulk(list(emails), field_name='content_hash')
+            Email.objects.bulk_create([email for content_hash, email in emails.items() if content_hash not in stored])
+            for outreach, content_hash in linked:
+                outreach.email = stored.get(content_hash) or emails[content_hash]
+                outreach.status = 'updated'
+                outreach.idempotency_key = run_key
+            Outreach.objects.bulk_update([outreach for outreach, _ in linked], ['email', 'status', 'idempotency_key'])
+        return len(linked)
@@ -0,0 +1,190 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .registry import get_agent
+
+logger = logging.getLogger(__name__)
+
+# Market research is independent; the prospecting stages feed each other
+AGENT_DEPENDENCIES = {
+    "market_researcher": (),
+    "business_researcher": (),
+    "decision_maker": ("business_researcher",),
+    "outreach_specialist": ("decision_maker",),
+}
+
+DEFAULT_AGENT_INPUTS = {
+    "market_researcher": "Research and log market trends, competitor offerings, and pricing in the stress management industry for Dallas-Fort Worth companies.",
+    "business_researcher": "Identify and add 5 high-stress companies in the Dallas-Fort Worth area to the database.",
+    "decision_maker": "Find and update decision-makers for all companies in the Dallas-Fort Worth area without decision-makers in the database.",
+    "outreach_specialist": "Process all pending outreach records by generating personalized email templates for DFW companies."
+}
+
+
+def run_with_connection(func, *args):
+    """Run func on a worker thread with its own, always released, DB connection."""
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        connection.close()
+
+
+def bounded_map(func, items, max_workers):
+    """Apply func to items on at most max_workers threads, preserving order."""
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        return list(pool.map(lambda item: run_with_connection(func, item), items))
+
+
+@dataclass
+class Stage:
+    """A pipeline step. func receives a StageContext once every dependency has succeeded."""
+    name: str
+    func: Callable[["StageContext"], Any]
+    depends_on: Tuple[str, ...] = ()
+    # Threads for the stage's fan-out work (StageContext.map); None leaves it to the stage
+    max_concurrency: Optional[int] = None
+
+
+@dataclass
+class StageResult:
+    """Outcome and wall-clock timing of a single stage."""
+    name: str
+    status: str = "pending"
+    result: Any = None
+    error: Optional[BaseException] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class StageContext:
+    """Handed to stage functions: upstream results plus a bounded pool for fan-out work."""
+    stage: Stage
+    upstream: dict = field(default_factory=dict)
+
+    def map(self, func, items):
+        """Apply func to items on at most stage.max_concurrency threads, preserving order."""
+        return bounded_map(func, items, self.stage.max_concurrency or 1)
+
+
+class Pipeline:
+    """
+    Runs stages as a dependency graph: every stage starts as soon as all of its
+    dependencies have succeeded, independent stages run concurrently, and stages
+    downstream of a failure are skipped.
+    """
+
+    def __init__(self, stages, max_workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique.")
+        for stage in stages:
+            missing = set(stage.depends_on) - set(self.stages)
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {sorted(missing)}")
+        self._check_acyclic()
+        self.max_workers = max_workers or len(stages)
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle through {name}.")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _execute(self, stage, result, upstream):
+        result.started_at = time.perf_counter()
+        try:
+            result.result = run_with_connection(stage.func, StageContext(stage=stage, upstream=upstream))
+            result.status = "completed"
+        except Exception as e:
+            logger.exception("Stage %s failed", stage.name)
+            result.error = e
+            result.status = "failed"
+        finally:
+            result.finished_at = time.perf_counter()
+        return result
+
+    def run(self):
+        """Run every stage and return a dict of StageResult keyed by stage name."""
+        results = {name: StageResult(name=name) for name in self.stages}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                for name, stage in self.stages.items():
+                    result = results[name]
+                    if result.status != "pending":
+                        continue
+                    dependency_states = {results[dep].status for dep in stage.depends_on}
+                    if dependency_states & {"failed", "skipped"}:
+                        result.status = "skipped"
+                        logger.warning("Skipping stage %s: an upstream stage did not complete", name)
+                    elif dependency_states <= {"completed"}:
+                        result.status = "running"
+                        upstream = {dep: results[dep].result for dep in stage.depends_on}
+                        running[pool.submit(self._execute, stage, result, upstream)] = name
+
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    logger.info("Stage %s %s in %.2fs", name, results[name].status, results[name].duration)
+
+        return results
+
+
+def run_agent_stage(name, input_data, context):
+    """
+    Run the registered agent `name`. Agents that fan work out (fans_out = True, e.g.
+    the sharded decision maker) do it on the stage's pool when the stage has a
+    concurrency limit, and on their own otherwise.
+    """
+    agent = get_agent(name)
+    if context.stage.max_concurrency and getattr(agent, "fans_out", False):
+        return agent.run(input_data, mapper=context.map)
+    return agent.run(input_data)
+
+
+def agent_stage(name, input_data, depends_on=None, max_concurrency=None):
+    """Stage that runs the registered agent `name` on input_data."""
+    concurrency = getattr(settings, "PIPELINE_STAGE_CONCURRENCY", {})
+    return Stage(
+        name=name,
+        func=lambda context: run_agent_stage(name, input_data, context),
+        depends_on=tuple(AGENT_DEPENDENCIES.get(name, ()) if depends_on is None else depends_on),
+        max_concurrency=max_concurrency or concurrency.get(name),
+    )
+
+
+def build_agent_pipeline(agent_inputs, max_workers=None):
+    """Pipeline over the agents in agent_inputs ({agent_name: input}) using AGENT_DEPENDENCIES."""
+    stages = [
+        agent_stage(name, input_data, depends_on=[dep for dep in AGENT_DEPENDENCIES.get(name, ()) if dep in agent_inputs])
+        for name, input_data in agent_inputs.items()
+    ]
+    return Pipeline(stages, max_workers=max_workers or getattr(settings, "PIPELINE_MAX_WORKERS", None))
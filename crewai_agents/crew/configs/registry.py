@@ -0,0 +1,50 @@
+import importlib
+import sys
+import threading
+
+AGENT_NAMES = ("market_researcher", "business_researcher", "decision_maker", "outreach_specialist")
+
+# name -> (agent, AgentConfig.updated_at it was built from)
+_agents = {}
+_lock = threading.Lock()
+
+
+def get_agent(name):
+    """
+    Return the agent registered under name, building it on first use.
+
+    Agents are memoized per process and rebuilt when the updated_at of their
+    active AgentConfig row changes, so edits in the admin take effect on the
+    next run. The agents module (and with it LangChain, the OpenAI client and
+    the Serper wrapper) is only imported when the first agent is requested, so
+    importing the crew configs stays cheap and key-free.
+    """
+    if name not in AGENT_NAMES:
+        raise ValueError(f"Unknown agent: {name}")
+    from .agent_config import config_version, load_agent_settings
+
+    version = config_version(name)
+    cached = _agents.get(name)
+    if cached is not None and cached[1] == version:
+        return cached[0]
+
+    with _lock:
+        cached = _agents.get(name)
+        if cached is None or cached[1] != version:
+            builders = importlib.import_module(".agents", __package__).AGENT_BUILDERS
+            config = load_agent_settings(name)
+            cached = (builders[name](config), config.version)
+            _agents[name] = cached
+    return cached[0]
+
+
+def reset_agents(name=None):
+    """Drop memoized agents (and, when name is None, the shared clients) so they are rebuilt."""
+    with _lock:
+        if name is None:
+            _agents.clear()
+            agents_module = sys.modules.get(f"{__package__}.agents")
+            if agents_module is not None:
+                agents_module.reset_clients()
+        else:
+            _agents.pop(name, None)
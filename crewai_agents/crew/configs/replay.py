@@ -0,0 +1,210 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from django.conf import settings
+from langchain_community.utilities import GoogleSerperAPIWrapper
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import message_to_dict, messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+logger = logging.getLogger(__name__)
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def request_key(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    JSON file of recorded responses keyed by request hash. Identical requests are
+    replayed in the order they were recorded (the last response repeats once
+    exhausted), so replaying a run is deterministic. Recorded responses are kept
+    in memory until flush(), which reset_cassettes() and interpreter exit call.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cursors = defaultdict(int)
+        self._dirty = False
+        self.interactions = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.interactions = json.load(f)
+
+    def record(self, key, response):
+        with self._lock:
+            self.interactions.setdefault(key, []).append(response)
+            self._dirty = True
+
+    def flush(self):
+        """Write the cassette if responses were recorded since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Written next to the cassette and moved into place, so an interrupted flush keeps the old file
+            partial = f"{self.path}.partial"
+            with open(partial, "w") as f:
+                json.dump(self.interactions, f)
+            os.replace(partial, self.path)
+            self._dirty = False
+
+    def replay(self, key):
+        with self._lock:
+            responses = self.interactions.get(key)
+            if not responses:
+                raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.path}")
+            index = min(self._cursors[key], len(responses) - 1)
+            self._cursors[key] += 1
+            return responses[index]
+
+
+def cassette_mode():
+    """'off', 'record' or 'replay' (CREW_CASSETTE_MODE)."""
+    return getattr(settings, "CREW_CASSETTE_MODE", "off")
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def _cassette(path):
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+def get_cassette(name):
+    """Per-process Cassette for CREW_CASSETTE_DIR/<name>.json."""
+    return _cassette(os.path.join(getattr(settings, "CREW_CASSETTE_DIR", "cassettes"), f"{name}.json"))
+
+
+def flush_cassettes():
+    """Write the responses recorded by every cassette of this process to disk."""
+    with _cassettes_lock:
+        cassettes = list(_cassettes.values())
+    for cassette in cassettes:
+        cassette.flush()
+
+
+atexit.register(flush_cassettes)
+
+
+def reset_cassettes():
+    """Flush recordings, then reload cassettes from disk and rewind their replay cursors."""
+    flush_cassettes()
+    with _cassettes_lock:
+        _cassettes.clear()
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model that records the responses of `wrapped` (record mode, through its
+    cached and rate-limited generation path) or serves them back from the cassette
+    with `latency` seconds of injected delay (replay mode, no network). Token usage
+    is recorded with each response and reported by this model's own run only, so
+    usage callbacks count every call once and see the same numbers in both modes.
+    """
+
+    cassette: Any
+    wrapped: Optional[BaseChatModel] = None
+    latency: float = 0.0
+    model_name: str = ""
+
+    @property
+    def _llm_type(self):
+        return "cassette"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = request_key({"model": self.model_name, "messages": messages_to_dict(messages),
+                           "stop": stop, "kwargs": kwargs})
+        if self.wrapped is None:
+            if self.latency:
+                time.sleep(self.latency)
+            recorded = self.cassette.replay(key)
+            message = messages_from_dict([recorded["message"]])[0]
+            return ChatResult(generations=[ChatGeneration(message=message)], llm_output=recorded["llm_output"])
+
+        # The wrapped model's LLM cache and rate limiter apply, but not its callbacks: generate() would
+        # start a second LLM run and usage callbacks would count the call twice
+        result = self.wrapped._generate_with_cache(messages, stop=stop, **kwargs)
+        self.cassette.record(key, {
+            "message": message_to_dict(result.generations[0].message),
+            "llm_output": result.llm_output,
+        })
+        return result
+
+
+class CassetteSerperWrapper(GoogleSerperAPIWrapper):
+    """Serper wrapper whose HTTP calls are recorded to, or replayed from, the cassette."""
+
+    cassette: Any = None
+    replay: bool = False
+    latency: float = 0.0
+
+    def _request_key(self, search_term, search_type, kwargs):
+        return request_key({"q": search_term, "type": search_type,
+                            **{key: value for key, value in kwargs.items() if value is not None}})
+
+    def _google_serper_api_results(self, search_term, search_type="search", **kwargs):
+        key = self._request_key(search_term, search_type, kwargs)
+        if self.replay:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.cassette.replay(key)
+        results = super()._google_serper_api_results(search_term, search_type=search_type, **kwargs)
+        self.cassette.record(key, results)
+        return results
+
+    async def _async_google_serper_search_results(self, search_term, search_type="search", **kwargs):
+        key = self._request_key(search_term, search_type, kwargs)
+        if self.replay:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.cassette.replay(key)
+        results = await super()._async_google_serper_search_results(search_term, search_type=search_type, **kwargs)
+        self.cassette.record(key, results)
+        return results
+
+
+def cassette_chat_model(llm=None, model_name=""):
+    """Record llm's responses, or replay them when llm is None."""
+    return CassetteChatModel(
+        cassette=get_cassette("llm"),
+        wrapped=llm,
+        latency=getattr(settings, "CREW_REPLAY_LLM_LATENCY", 0.0) if llm is None else 0.0,
+        model_name=model_name or getattr(llm, "model_name", ""),
+        cache=False,
+    )
+
+
+def cassette_search(**params):
+    """Serper wrapper bound to the search cassette for the current cassette mode."""
+    replay = cassette_mode() == "replay"
+    if replay:
+        # No network in replay mode, so no key is needed
+        params["serper_api_key"] = params.get("serper_api_key") or "replay"
+    return CassetteSerperWrapper(
+        cassette=get_cassette("search"),
+        replay=replay,
+        latency=getattr(settings, "CREW_REPLAY_SEARCH_LATENCY", 0.0) if replay else 0.0,
+        **params,
+    )
@@ -0,0 +1,132 @@
+import json
+import logging
+import threading
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; estimate when that is not possible
+        logger.info("tiktoken unavailable (%s), estimating token counts", e)
+        return None
+
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _step_tokens(action, observation):
+    return count_tokens(getattr(action, "log", "") or "") + count_tokens(str(observation))
+
+
+def fixed_prompt_tokens(agent):
+    """
+    Tokens an agent sends on every planning step besides its scratchpad and input:
+    the ReAct prompt template (system prompt, tool descriptions, format instructions),
+    or the system message and function schemas in tool-calling mode.
+    """
+    llm_chain = getattr(agent, "llm_chain", None)
+    if llm_chain is not None:
+        return count_tokens(llm_chain.prompt.format(input="", agent_scratchpad=""))
+    messages = agent.prompt.format_messages(input="", agent_scratchpad=[])
+    return (count_tokens("\n".join(str(message.content) for message in messages))
+            + count_tokens(json.dumps(getattr(agent, "functions", []))))
+
+
+class ScratchpadManager:
+    """
+    Bounds the agent scratchpad. Plugged into AgentExecutor.trim_intermediate_steps,
+    it is called before every planning step. Every step's action (reasoning, tool
+    and tool input) is kept verbatim, so the agent still knows what it already did;
+    only observations are shortened. The latest keep_last observations are passed
+    through, older ones are truncated to observation_chars and, while the scratchpad
+    exceeds token_budget, cut to a one-line summary, oldest first. `metrics` keeps
+    the per-step prompt size (prompt_tokens of the fixed prompt, set by build_agent,
+    plus the scratchpad) before and after compaction.
+    """
+
+    # Characters of an observation kept once the scratchpad is over budget
+    summary_chars = 100
+
+    def __init__(self, keep_last=None, token_budget=None, observation_chars=None, max_metrics=1000):
+        self.keep_last = keep_last if keep_last is not None else getattr(settings, "SCRATCHPAD_KEEP_LAST_STEPS", 3)
+        self.token_budget = token_budget if token_budget is not None else getattr(settings, "SCRATCHPAD_TOKEN_BUDGET", 6000)
+        self.observation_chars = (observation_chars if observation_chars is not None
+                                  else getattr(settings, "SCRATCHPAD_OBSERVATION_CHARS", 500))
+        self.prompt_tokens = 0
+        self.metrics = deque(maxlen=max_metrics)
+        self._lock = threading.Lock()
+
+    def compact_observation(self, observation):
+        text = str(observation)
+        if len(text) <= self.observation_chars:
+            return observation
+        return f"{text[:self.observation_chars]} ... [{len(text) - self.observation_chars} chars truncated]"
+
+    def summarize_observation(self, observation):
+        """First line of the observation, cut to summary_chars."""
+        text = str(observation)
+        first_line = text.strip().split("\n", 1)[0][:self.summary_chars]
+        if len(first_line) >= len(text.strip()):
+            return observation
+        return f"{first_line} ... [observation shortened from {len(text)} chars]"
+
+    def __call__(self, intermediate_steps):
+        split = max(len(intermediate_steps) - self.keep_last, 0)
+        older, recent = intermediate_steps[:split], intermediate_steps[split:]
+
+        compacted = [(action, self.compact_observation(observation)) for action, observation in older]
+        sizes = [_step_tokens(action, observation) for action, observation in compacted]
+        recent_tokens = sum(_step_tokens(action, observation) for action, observation in recent)
+
+        summarized = 0
+        if self.token_budget:
+            for index, (action, observation) in enumerate(older):
+                if sum(sizes) + recent_tokens <= self.token_budget:
+                    break
+                compacted[index] = (action, self.summarize_observation(observation))
+                sizes[index] = _step_tokens(*compacted[index])
+                summarized += 1
+
+        steps = compacted + list(recent)
+        self._record(intermediate_steps, steps, sum(sizes) + recent_tokens, summarized)
+        return steps
+
+    def _record(self, raw_steps, steps, scratchpad_tokens, summarized):
+        raw_tokens = self.prompt_tokens + sum(_step_tokens(action, observation) for action, observation in raw_steps)
+        metric = {
+            "step": len(raw_steps),
+            "raw_tokens": raw_tokens,
+            "compacted_tokens": self.prompt_tokens + scratchpad_tokens,
+            "scratchpad_tokens": scratchpad_tokens,
+            "kept_steps": len(steps),
+            "summarized_steps": summarized,
+        }
+        with self._lock:
+            self.metrics.append(metric)
+        logger.debug("Prompt at step %(step)s: %(raw_tokens)s -> %(compacted_tokens)s tokens", metric)
+
+    def summary(self):
+        """Totals over the recorded steps: prompt tokens that would have been sent vs. were sent."""
+        with self._lock:
+            metrics = list(self.metrics)
+        raw = sum(metric["raw_tokens"] for metric in metrics)
+        compacted = sum(metric["compacted_tokens"] for metric in metrics)
+        return {
+            "steps": len(metrics),
+            "raw_tokens": raw,
+            "compacted_tokens": compacted,
+            "saved_tokens": raw - compacted,
+        }
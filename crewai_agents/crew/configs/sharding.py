@@ -0,0 +1,78 @@
+import json
+import logging
+
+from ..tools.database_tools import companies_without_decision_makers
+from .pipeline import bounded_map
+
+logger = logging.getLogger(__name__)
+
+SHARD_INPUT_TEMPLATE = """Find decision-makers for ONLY the companies listed below and save them.
+
+Companies (JSON):
+{companies}
+
+For EACH company, one at a time:
+1. Use web_search to find decision-makers (HR managers, CEOs) on LinkedIn, Google, and Yahoo.
+2. Call update_decision_makers ONCE with a plain JSON string containing "company_id" (integer from the list above)
+   and "decision_makers" (list of dicts with "name", "role", "email", "phone", "linkedin_profile",
+   "preferred_contact", "last_contact_date", "notes"; use "N/A" or "email@example.com" when not found).
+   Example: {{"company_id": 7, "decision_makers": [{{"name": "Robert Isom", "role": "Chief Executive Officer", "email": "email@example.com", "phone": "N/A", "linkedin_profile": "N/A", "preferred_contact": "N/A", "last_contact_date": "2025-02-27", "notes": "N/A"}}]}}
+
+Do not wrap the JSON in backticks or quotes. Stop once every company above has been updated."""
+
+
+def chunked(items, size):
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class ShardedDecisionMaker:
+    """
+    Drop-in replacement for the decision_maker agent that walks the backlog of
+    companies without decision makers in keyset pages and splits each page into
+    small batches. Each batch gets its own short agent run (and therefore a fresh
+    scratchpad) on a bounded worker pool; the agent persists results through
+    update_decision_makers as usual. A pipeline stage can pass its own bounded
+    map as mapper (PIPELINE_STAGE_CONCURRENCY) in place of max_workers.
+    """
+
+    fans_out = True
+
+    def __init__(self, agent, batch_size=1, max_workers=4, page_size=25):
+        self.agent = agent
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.page_size = max(page_size, batch_size)
+
+    def run(self, input_data=None, mapper=None):
+        mapper = mapper or (lambda func, items: bounded_map(func, items, self.max_workers))
+        outcomes, processed, after_id = [], 0, 0
+        while True:
+            # Companies a batch failed on keep no decision makers; the keyset still moves past them
+            companies = companies_without_decision_makers(after_id, self.page_size)
+            if not companies:
+                break
+            batches = chunked(companies, self.batch_size)
+            logger.info("Decision maker fan-out: %d companies after id %d in %d batches",
+                        len(companies), after_id, len(batches))
+            outcomes += mapper(self._run_batch, batches)
+            processed += len(companies)
+            after_id = companies[-1]['company_id']
+        if not processed:
+            return "No companies found without decision-makers."
+
+        failed = [outcome for outcome in outcomes if outcome["error"]]
+        lines = [f"Processed {processed} companies in {len(outcomes)} batches ({len(failed)} failed)."]
+        for outcome in outcomes:
+            status = f"Error: {outcome['error']}" if outcome["error"] else outcome["output"]
+            lines.append(f"Companies {outcome['company_ids']}: {status}")
+        return "\n".join(lines)
+
+    def _run_batch(self, batch):
+        company_ids = [company['company_id'] for company in batch]
+        try:
+            output = self.agent.run(SHARD_INPUT_TEMPLATE.format(companies=json.dumps(batch)))
+            return {"company_ids": company_ids, "output": output, "error": None}
+        except Exception as e:
+            logger.exception("Decision maker batch %s failed", company_ids)
+            return {"company_ids": company_ids, "output": None, "error": str(e)}
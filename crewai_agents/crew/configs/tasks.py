@@ -1,8 +1,21 @@
 from celery import shared_task
-from .agents import market_researcher, business_researcher, decision_maker, outreach_specialist
+from .registry import get_agent
 from django.apps import apps
 from django.utils import timezone
 
+
+def run_agent(agent, input_data, task_id):
+    """
+    Run an agent for an AgentTask. LangChain executors get the task id as run
+    metadata, which their tools see on run_manager.metadata; Celery retries of
+    the task carry the same id, so tools can recognise work already done. Other
+    agents get it too when they declare takes_metadata.
+    """
+    from langchain.chains.base import Chain
+    if isinstance(agent, Chain) or getattr(agent, "takes_metadata", False):
+        return agent.run(input_data, metadata={"agent_task_id": task_id})
+    return agent.run(input_data)
+
 @shared_task(bind=True, max_retries=3)
 def run_agent_task(self, task_id, agent_name, input_data):
     try:
@@ -12,17 +25,9 @@ def run_agent_task(self, task_id, agent_name, input_data):
         task.started_at = timezone.now()
         task.save()
 
-        agents = {
-            "market_researcher": market_researcher,
-            "business_researcher": business_researcher,
-            "decision_maker": decision_maker,
-            "outreach_specialist": outreach_specialist
-        }
-        agent = agents.get(agent_name)
-        if not agent:
-            raise ValueError(f"Unknown agent: {agent_name}")
+        agent = get_agent(agent_name)
 
-        result = agent.run(input_data)
+        result = run_agent(agent, input_data, task_id)
 
         task.status = "COMPLETED"
         task.completed_at = timezone.now()
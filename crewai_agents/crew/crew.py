@@ -1,17 +1,11 @@
-from crewai_agents.crew.configs.agents import market_researcher, business_researcher, decision_maker, outreach_specialist
+from crewai_agents.crew.configs import AGENT_NAMES, get_agent
 
 def run_manually(agent_name, input_data):
     """Run an agent manually and print the result."""
-    agents = {
-        "market_researcher": market_researcher,
-        "business_researcher": business_researcher,
-        "decision_maker": decision_maker,
-        "outreach_specialist": outreach_specialist
-    }
-    agent = agents.get(agent_name)
-    if not agent:
+    if agent_name not in AGENT_NAMES:
         print(f"Unknown agent: {agent_name}")
         return
+    agent = get_agent(agent_name)
 
     print(f"Running {agent_name} manually...")
     result = agent.run(input_data)
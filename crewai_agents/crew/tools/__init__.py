@@ -1 +1,6 @@
-from .database_tools import CompanyUpdateTool, CompetitorTrendTool, OutreachLogTool, fetch_outreach_data_tool, fetching_pending_outreach_ids, fetch_companies_tool, update_decision_makers_tool
+from .database_tools import CompanyUpdateTool, CompetitorTrendTool, OutreachLogTool, fetch_outreach_data_tool, fetching_pending_outreach_ids, fetch_companies_tool, update_decision_makers_tool, check_known_company_tool
+
+from .rate_limit import ModelRateLimiter, RateLimiter, ToolRateLimitHandler
+from .search import MultiWebSearchTool, SearchCompactor, SearchLedger, SearchResultCache, SerperAsyncClient, WebSearchTool, normalize_query
+from .structured import STRUCTURED_TOOLS, structured_counterpart
+from .trend_buffer import TrendFlushHandler, TrendWriteBuffer
\ No newline at end of file
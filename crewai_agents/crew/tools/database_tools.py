@@ -1,353 +1,697 @@
 from langchain.tools import BaseTool
+from asgiref.sync import sync_to_async
 from django.db import transaction
+from django.db.models import F
 from langchain.tools import Tool
 from django.apps import apps
+from django.conf import settings
 import json
-import ast
-from django.core.exceptions import ObjectDoesNotExist
+import logging
+from typing import Any
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.utils import timezone
 
+from .parsing import ToolInputError, parse_tool_input, validate
+from .trend_buffer import asave_trends, save_trends
+from .schemas import CompanyInput, CompanyPageInput, CompetitorTrendInput, DecisionMakersInput, KnownCompanyInput, OutreachIdsInput, OutreachLogInput
+
+logger = logging.getLogger(__name__)
+
+# CompanyInput fields -> Company fields
+COMPANY_FIELD_ALIASES = {
+    "company_name": "company_name",
+    "size": "employee_size",
+    "industry": "industry",
+    "location": "location",
+    "website_url": "website_url",
+    "revenue_growth": "revenue_growth",
+    "stress_score": "stress_level_score",
+    "wellness_culture_score": "wellness_culture_score",
+    "priority_score": "priority_score",
+    "targeting_reason": "targeting_reason",
+    "notes": "notes",
+}
+COMPANY_REQUIRED_FIELDS = ("company_name", "employee_size", "industry", "location")
+# Non-null columns without a model default, filled in when a company is created without them
+COMPANY_CREATE_DEFAULTS = {"website_url": "", "targeting_reason": ""}
+# What agents pass to tools that take no input
+EMPTY_INPUTS = {"", "none", "null", "{}", "n/a"}
+
+
+def company_fields(item):
+    """
+    Company field values from one validated CompanyInput dict, each checked against
+    its model field (type, length, integer range, URL), so a bad item is rejected
+    before the bulk write instead of failing the whole batch; raises ValueError.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("each company must be a dict")
+    fields = {}
+    for key, value in item.items():
+        field = COMPANY_FIELD_ALIASES.get(key)
+        if field is not None and value is not None and value != "":
+            fields[field] = value
+    missing = [field for field in COMPANY_REQUIRED_FIELDS if field not in fields]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    url = fields.get("website_url")
+    if url and "://" not in url:
+        fields["website_url"] = f"https://{url.strip()}"
+    Company = apps.get_model('crewai_agents', 'Company')
+    for field, value in fields.items():
+        try:
+            fields[field] = Company._meta.get_field(field).clean(value, None)
+        except ValidationError as e:
+            raise ValueError(f"{field}: {' '.join(e.messages)}") from None
+    return fields
+
+
 class CompanyUpdateTool(BaseTool):
     name: str = "company_update"
-    description: str = "Updates or creates a company record in the database. Input should be a dict with keys: company_name (str), size (int), industry (str), location (str), stress_score (float, optional)"
+    description: str = "Updates or creates company records in the database. Input should be a dict (or a list of dicts to save several companies at once) with keys: company_name (str), size (int), industry (str), location (str), and optionally stress_score (float), website_url (str), revenue_growth (float), wellness_culture_score (float), priority_score (float), targeting_reason (str), notes (str). Other keys are ignored."
 
     def _run(self, input_data):
-        print(f"DEBUG - Input data type: {type(input_data)}")
-        print(f"DEBUG - Input data raw: {repr(input_data)}")
-        
-        # Force parsing if the input is passed as a string
-        if isinstance(input_data, str):
-            print(f"DEBUG - Input is string, attempting to parse")
-            # Try multiple parsing methods
-            try:
-                # Try json.loads (standard JSON parser)
-                input_data = json.loads(input_data)
-                print(f"DEBUG - Parsed with json.loads: {input_data}")
-            except json.JSONDecodeError as e:
-                print(f"DEBUG - JSON decode error: {str(e)}")
-                try:
-                    # Try ast.literal_eval (Python literal parser)
-                    import ast
-                    input_data = ast.literal_eval(input_data)
-                    print(f"DEBUG - Parsed with ast.literal_eval: {input_data}")
-                except Exception as e:
-                    print(f"DEBUG - ast parse error: {str(e)}")
-                    # Last resort: manual string cleaning and parsing
-                    try:
-                        # Replace single quotes with double quotes
-                        fixed_json = input_data.replace("'", '"')
-                        input_data = json.loads(fixed_json)
-                        print(f"DEBUG - Parsed with manual fix: {input_data}")
-                    except Exception as e:
-                        print(f"DEBUG - Manual fix error: {str(e)}")
-                        return f"Error: Could not parse input: {repr(input_data)}"
-
-        # After parsing attempts, ensure input_data is a dict
-        if not isinstance(input_data, dict):
-            print(f"DEBUG - Final input is not a dict: {type(input_data)}")
-            return "Error: Input data is not a valid dictionary after parsing."
-        
-        print(f"DEBUG - Final parsed input: {input_data}")
+        try:
+            input_data = parse_tool_input(input_data, expect=(dict, list))
+        except ToolInputError as e:
+            return f"Error: {e}"
 
         try:
-            Company = apps.get_model('crewai_agents', 'Company')
-            with transaction.atomic():
-                # Get the actual field names from the model to check
-                field_names = [field.name for field in Company._meta.get_fields()]
-                print(f"DEBUG - Available fields: {field_names}")
-                
-                # Use the correct field names based on your model
-                company, created = Company.objects.update_or_create(
-                    company_name=input_data["company_name"],
-                    defaults={
-                        "employee_size": input_data["size"],
-                        "industry": input_data["industry"],
-                        "location": input_data["location"],
-                        "stress_level_score": input_data.get("stress_score", 0)
-                    }
-                )
-            return f"Company {'created' if created else 'updated'}: {input_data['company_name']}"
+            results = self.upsert(input_data if isinstance(input_data, list) else [input_data])
+        except Exception as e:
+            logger.exception("company_update failed")
+            return f"Error: {str(e)}"
+        return self.report(input_data, results)
+
+    async def _arun(self, input_data):
+        try:
+            input_data = parse_tool_input(input_data, expect=(dict, list))
+        except ToolInputError as e:
+            return f"Error: {e}"
+
+        try:
+            # The upsert is one transaction, which the async ORM cannot span, so it runs in Django's sync thread
+            results = await sync_to_async(self.upsert)(input_data if isinstance(input_data, list) else [input_data])
         except Exception as e:
-            print(f"DEBUG - Exception in database operation: {str(e)}")
+            logger.exception("company_update failed")
             return f"Error: {str(e)}"
+        return self.report(input_data, results)
+
+    @staticmethod
+    def report(input_data, results):
+        if isinstance(input_data, dict):
+            result = results[0]
+            if result["status"] == "error":
+                return f"Error: {result['error']}"
+            return f"Company {result['status']}: {result['company_name']}"
+        return json.dumps(results)
+
+    def upsert(self, items):
+        """
+        Insert or update companies in one transaction, with one bulk upsert by
+        canonical key per distinct set of supplied fields. Items are first matched
+        to stored companies by name or website (see resolve). Returns one result
+        dict per item: status is "created", "updated" or "error".
+        """
+        Company = apps.get_model('crewai_agents', 'Company')
+        Email = apps.get_model('crewai_agents', 'Email')
+        Outreach = apps.get_model('crewai_agents', 'Outreach')
+        from ...signals.outreach import default_outreach
+        from ...models.models import website_domain
+
+        results = [None] * len(items)
+        rows = []
+        for index, item in enumerate(items):
+            name = item.get("company_name") if isinstance(item, dict) else None
+            try:
+                fields = company_fields(validate(item, CompanyInput))
+                key = Company.key_for(fields["company_name"])
+                if key is None:
+                    raise ValueError("company_name is empty after normalizing")
+            except (ValueError, TypeError) as e:
+                results[index] = {"company_name": name, "status": "error", "error": str(e)}
+                continue
+            rows.append((index, key, fields))
+
+        with transaction.atomic():
+            rows, existing = self.resolve(Company, rows, results)
+            groups = {}
+            for key, (index, fields) in rows.items():
+                groups.setdefault(frozenset(fields), []).append((key, index, fields))
+            for field_set, group in groups.items():
+                Company.objects.bulk_create(
+                    [Company(**{**COMPANY_CREATE_DEFAULTS, **fields}, canonical_key=key,
+                             website_domain=website_domain(fields.get("website_url")))
+                     for key, _, fields in group],
+                    update_conflicts=True,
+                    unique_fields=['canonical_key'],
+                    update_fields=sorted(field_set | ({"website_domain"} if "website_url" in field_set else set())),
+                )
+            # bulk_create does not send post_save, so new companies get their outreach here
+            created = [key for key in rows if key not in existing]
+            if created:
+                template = Email.objects.filter(is_default=True).first()
+                Outreach.objects.bulk_create(
+                    [default_outreach(company, template) for company in Company.objects.filter(canonical_key__in=created)]
+                )
+
+        for key, (index, fields) in rows.items():
+            results[index] = {"company_name": fields["company_name"],
+                              "status": "updated" if key in existing else "created"}
+        return results
+
+    @staticmethod
+    def resolve(Company, rows, results):
+        """
+        Match (index, canonical key, fields) rows to stored companies by name or
+        website domain, as Company.find_known does, in one query. A row whose
+        website belongs to a company stored under another name updates that
+        company and keeps its stored name; a row whose name matches a company with
+        another website is reported as a collision instead of overwriting it. A
+        later row for the same company (same key or website) replaces an earlier
+        one. Returns {key: (index, fields)} to write and the keys already stored.
+        """
+        from ...models.models import website_domain
+
+        lookup = Company.known_lookup()
+        for _, _, fields in rows:
+            lookup |= Company.known_lookup(fields["company_name"], fields.get("website_url"))
+        stored = list(Company.objects.filter(lookup).values('id', 'company_name', 'canonical_key', 'website_domain'))
+        by_key = {row['canonical_key']: row for row in stored}
+        by_domain = {row['website_domain']: row for row in stored if row['website_domain'] and row['canonical_key']}
+
+        resolved, batch_domains = {}, {}
+        for index, key, fields in rows:
+            domain = website_domain(fields.get("website_url"))
+            match = by_key.get(key)
+            if match is not None and domain and match['website_domain'] and match['website_domain'] != domain:
+                results[index] = {"company_name": fields["company_name"], "status": "error",
+                                  "error": f"{match['company_name']} (ID {match['id']}) is stored with website "
+                                           f"{match['website_domain']}, not {domain}; use the full legal name "
+                                           f"if this is a different company"}
+                continue
+            if match is None and domain in by_domain:
+                match = by_domain[domain]
+                key, fields = match['canonical_key'], {**fields, "company_name": match['company_name']}
+            for earlier in {key, batch_domains.get(domain)} - {None}:
+                previous = resolved.pop(earlier, None)
+                if previous is not None:
+                    results[previous[0]] = {"company_name": previous[1]["company_name"], "status": "error",
+                                            "error": "duplicate of a later item in this batch"}
+            resolved[key] = (index, fields)
+            if domain:
+                batch_domains[domain] = key
+        return resolved, {key for key in resolved if key in by_key}
 
 
 class CompetitorTrendTool(BaseTool):
     name: str = "competitor_trend_update"
     description: str = "Logs competitor trends for analysis. Input should be a dict with keys: competitor_name (str), trend_description (str), impact_level (str)."
+    # TrendWriteBuffer shared by the agent runs; without one each trend is written at once
+    buffer: Any = None
 
-    def _run(self, input_data):        
-        # Handle different input types
-        if isinstance(input_data, str):
-            # If the input is already a string containing quotes
-            if input_data.startswith("'") and input_data.endswith("'"):
-                # Remove the outer quotes
-                input_data = input_data[1:-1]
-                print(f"DEBUG - Removed outer quotes: {input_data}")
-                
-            try:
-                # Try parsing as JSON
-                input_data = json.loads(input_data)
-                print(f"DEBUG - Parsed with json.loads: {input_data}")
-            except json.JSONDecodeError:
-                try:
-                    # Try parsing as Python literal
-                    import ast
-                    input_data = ast.literal_eval(input_data)
-                    print(f"DEBUG - Parsed with ast.literal_eval: {input_data}")
-                except Exception as e:
-                    print(f"DEBUG - Parsing error: {str(e)}")
-                    try:
-                        # Final attempt: convert single quotes to double quotes
-                        input_data = json.loads(input_data.replace("'", '"'))
-                        print(f"DEBUG - Parsed after quote replacement: {input_data}")
-                    except Exception as e2:
-                        print(f"DEBUG - Final parsing error: {str(e2)}")
-                        return "Error: Input string is not valid JSON."
-
-        # Ensure input_data is a dict after deserialization
-        if not isinstance(input_data, dict):
-            print(f"DEBUG - Input is not a dict: {type(input_data)}")
-            return "Error: Input data is not a valid dictionary."
-
-        print(f"DEBUG - Final parsed input: {input_data}")
-
-        # Create the CompetitorTrend object
-        CompetitorTrend = apps.get_model('crewai_agents', 'CompetitorTrend')
-        
+    def _run(self, input_data, run_manager=None):
+        try:
+            fields = self.trend_fields(input_data)
+        except ToolInputError as e:
+            return f"Error: {e}"
+        try:
+            if self.buffer is not None:
+                status = self.buffer.add(getattr(run_manager, "parent_run_id", None), fields)
+            else:
+                from ...models.models import trend_content_hash
+                written, _ = save_trends({trend_content_hash(fields["competitor_name"], fields["trend_description"]): fields})
+                status = "saved" if written else "duplicate"
+        except Exception as e:
+            logger.exception("competitor_trend_update failed")
+            return f"Error: {str(e)}"
+        return self.report(status, fields)
+
+    async def _arun(self, input_data, run_manager=None):
+        try:
+            fields = self.trend_fields(input_data)
+        except ToolInputError as e:
+            return f"Error: {e}"
         try:
-            trend = CompetitorTrend.objects.create(
-                competitor_name=input_data["competitor_name"],
-                trend_description=input_data["trend_description"],
-                impact_level=input_data["impact_level"]
-            )
-
-            # Print the trend object for debugging
-            print(f"Logged trend: {trend}")
-
-            # Returning success message with trend info (ensure 'id' exists)
-            if hasattr(trend, 'id'):
-                return f"Logged trend for {input_data['competitor_name']}: {trend.id}"
+            if self.buffer is not None:
+                status = await self.buffer.aadd(getattr(run_manager, "parent_run_id", None), fields)
             else:
-                return f"Logged trend for {input_data['competitor_name']} (no ID found)"
+                from ...models.models import trend_content_hash
+                written, _ = await asave_trends({trend_content_hash(fields["competitor_name"], fields["trend_description"]): fields})
+                status = "saved" if written else "duplicate"
         except Exception as e:
-            print(f"DEBUG - Exception in trend creation: {str(e)}")
+            logger.exception("competitor_trend_update failed")
             return f"Error: {str(e)}"
+        return self.report(status, fields)
+
+    @staticmethod
+    def trend_fields(input_data):
+        input_data = parse_tool_input(input_data, CompetitorTrendInput)
+        return {key: input_data[key] for key in ("competitor_name", "trend_description", "impact_level")}
+
+    @staticmethod
+    def report(status, fields):
+        if status == "duplicate":
+            return f"Trend for {fields['competitor_name']} was already logged; skipped. Log a different finding."
+        if status == "queued":
+            return f"Logged trend for {fields['competitor_name']} (saved when the research run ends)"
+        return f"Logged trend for {fields['competitor_name']}"
+
+
+def idempotency_key(run_manager):
+    """
+    Key of the agent run a tool call belongs to: the AgentTask id from the run
+    metadata (shared by Celery retries of the task), else the executor's run id.
+    None outside an agent run.
+    """
+    metadata = getattr(run_manager, "metadata", None) or {}
+    if metadata.get("agent_task_id") is not None:
+        return f"task:{metadata['agent_task_id']}"
+    run_id = getattr(run_manager, "parent_run_id", None)
+    return f"run:{run_id}" if run_id is not None else None
+
+
+# What OutreachLogTool reads of the outreach it updates
+OUTREACH_LOG_FIELDS = ('outreach_id', 'email_id', 'status', 'idempotency_key', 'company__company_name')
 
 
 class OutreachLogTool(BaseTool):
     name: str = "outreach_log"
     description: str = """
     Update an existing outreach record's email foreign key with a new email template.
-    Expects input dict with: outreach_id (int), email_template_data (dict with 'name', 'subject', 'content', optionally 'recipient'), status (str, optional).
-    Creates a new Email record and links it to the Outreach identified by outreach_id.
+    Expects input dict with: outreach_id (int), email_template_data (dict with 'name', 'subject', 'content', optionally 'recipient').
+    Links the Email with that subject, recipient and content (created if it does not exist yet) to the Outreach identified by outreach_id.
     """
 
-    def _run(self, input_data):
-        print(f"DEBUG - Raw input: {repr(input_data)}")
-        
-        # Handle string input from the agent
-        if isinstance(input_data, str):
-            try:
-                input_data = json.loads(input_data)
-            except json.JSONDecodeError:
-                try:
-                    import ast
-                    input_data = ast.literal_eval(input_data)
-                except (ValueError, SyntaxError):
-                    return "Error: Input string is not valid JSON or dictionary."
-
-        # Ensure input_data is a dict
-        if not isinstance(input_data, dict):
-            return "Error: Input data must be a dictionary."
-
-        # Extract required fields
+    def _run(self, input_data, run_manager=None):
         try:
-            outreach_id = input_data["outreach_id"]
-            email_template_data = input_data.get("email_template_data")
-            status = 'updated'
-        except KeyError as e:
-            return f"Error: Missing required field {str(e)} in input: {repr(input_data)}"
-
+            input_data = parse_tool_input(input_data, OutreachLogInput)
+        except ToolInputError as e:
+            return f"Error: {e}"
+        outreach_id = input_data["outreach_id"]
         Outreach = apps.get_model('crewai_agents', 'Outreach')
         Email = apps.get_model('crewai_agents', 'Email')
-        
+        key = idempotency_key(run_manager)
+
         try:
             # Get the existing outreach record
-            outreach = Outreach.objects.get(outreach_id=outreach_id)
-            
-            # Handle email update
-            if email_template_data:
-                # Create a new Email record based on your Email model
-                email = Email.objects.create(
-                    name=email_template_data.get("name", f"Email for {outreach.company.company_name}"),
-                    recipient=email_template_data.get("recipient", None),  # Optional, nullable
-                    subject=email_template_data.get("subject", f"Introduction to {outreach.company.company_name}"),
-                    content=email_template_data.get("content", "Default content placeholder"),
-                    is_active=True,
-                    is_default=email_template_data.get("is_default", True)  
-                )
-                # Update the outreach record's email foreign key
-                outreach.email = email
-                if status: 
-                    outreach.status = status
-                outreach.save()
-                return f"Updated outreach {outreach.outreach_id} with email ID {email.id}"
-            else:
-                return "Error: No email_template_data provided to update the email."
+            outreach = Outreach.objects.select_related('company').only(*OUTREACH_LOG_FIELDS).get(outreach_id=outreach_id)
+            if self.logged_in_run(outreach, key):
+                return f"Outreach {outreach.outreach_id} was already updated in this run with email ID {outreach.email_id}"
+            # Identical emails (same subject, recipient and body) are stored once
+            content_hash, defaults = self.email_fields(outreach, input_data.get("email_template_data"))
+            email, created = Email.objects.get_or_create(content_hash=content_hash, defaults=defaults)
+            # Update the outreach record's email foreign key
+            self.link(outreach, email, key)
+            outreach.save(update_fields=['email', 'status', 'idempotency_key'])
+            return self.report(outreach, email, created)
 
         except Outreach.DoesNotExist:
             return f"Error: Outreach with ID {outreach_id} not found."
         except Exception as e:
             return f"Error updating outreach: {str(e)}"
 
-    def _arun(self, *args, **kwargs):
-        raise NotImplementedError("Async not supported yet.")
-
+    async def _arun(self, input_data, run_manager=None):
+        try:
+            input_data = parse_tool_input(input_data, OutreachLogInput)
+        except ToolInputError as e:
+            return f"Error: {e}"
+        outreach_id = input_data["outreach_id"]
+        Outreach = apps.get_model('crewai_agents', 'Outreach')
+        Email = apps.get_model('crewai_agents', 'Email')
+        key = idempotency_key(run_manager)
 
-def fetch_outreach_data(outreach_id):
-    """Fetch outreach data and associated company details using an outreach_id."""
-    if isinstance(outreach_id, str):
         try:
-            data = json.loads(outreach_id)
-            if isinstance(data, dict) and 'outreach_id' in data:
-                outreach_id = data['outreach_id']
-        except json.JSONDecodeError:
-            if outreach_id.isdigit():
-                outreach_id = int(outreach_id)
-            else:
-                return f"Error: Invalid outreach_id format: {outreach_id}. Please provide a numeric outreach ID."
+            outreach = await Outreach.objects.select_related('company').only(*OUTREACH_LOG_FIELDS).aget(outreach_id=outreach_id)
+            if self.logged_in_run(outreach, key):
+                return f"Outreach {outreach.outreach_id} was already updated in this run with email ID {outreach.email_id}"
+            content_hash, defaults = self.email_fields(outreach, input_data.get("email_template_data"))
+            email, created = await Email.objects.aget_or_create(content_hash=content_hash, defaults=defaults)
+            self.link(outreach, email, key)
+            await outreach.asave(update_fields=['email', 'status', 'idempotency_key'])
+            return self.report(outreach, email, created)
 
-    try:
-        Outreach = apps.get_model('crewai_agents', 'Outreach')
-        outreach = Outreach.objects.get(outreach_id=outreach_id)  
-        company = outreach.company
- 
-        
-        return {
-            'outreach_id': outreach.outreach_id,
-            'company_id': company.id,
-            'company_name': company.company_name,
-            'industry': company.industry,
-            'size': company.employee_size,
-            'location': company.location,
-            'decision_makers': company.decision_makers if company.decision_makers else {},
-            'outreach_status': outreach.status,
-            'outreach_email_id': outreach.email.id if outreach.email else None,
-            'outreach_date': str(outreach.outreach_date) if outreach.outreach_date else None
+        except Outreach.DoesNotExist:
+            return f"Error: Outreach with ID {outreach_id} not found."
+        except Exception as e:
+            return f"Error updating outreach: {str(e)}"
+
+    @staticmethod
+    def logged_in_run(outreach, key):
+        """A repeated step or a retry of the same task: the outreach already has its email."""
+        return key is not None and outreach.idempotency_key == key and bool(outreach.email_id)
+
+    @staticmethod
+    def email_fields(outreach, email_template_data):
+        """(content_hash, get_or_create defaults) of the Email described by email_template_data."""
+        from ...models.models import email_content_hash
+        company_name = outreach.company.company_name if outreach.company else f"outreach {outreach.outreach_id}"
+        subject = email_template_data.get("subject") or f"Introduction to {company_name}"
+        recipient = email_template_data.get("recipient") or None
+        content = email_template_data.get("content") or "Default content placeholder"
+        return email_content_hash(subject, recipient, content), {
+            "name": email_template_data.get("name") or f"Email for {company_name}",
+            "recipient": recipient,
+            "subject": subject,
+            "content": content,
+            "is_active": True,
+            "is_default": email_template_data.get("is_default", True),
         }
-    except Outreach.DoesNotExist:
-        return f"Outreach with ID {outreach_id} not found."
+
+    @staticmethod
+    def link(outreach, email, key):
+        outreach.email = email
+        outreach.status = 'updated'
+        outreach.idempotency_key = key
+
+    @staticmethod
+    def report(outreach, email, created):
+        if not created:
+            return f"Updated outreach {outreach.outreach_id} with existing email ID {email.id}"
+        return f"Updated outreach {outreach.outreach_id} with email ID {email.id}"
+
+
+# Only the columns an outreach context needs; the email is reported by its foreign key
+OUTREACH_CONTEXT_FIELDS = (
+    'outreach_id', 'status', 'outreach_date', 'email_id',
+    'company__id', 'company__company_name', 'company__industry', 'company__employee_size',
+    'company__location', 'company__decision_makers',
+)
+
+
+def outreach_context(outreach):
+    company = outreach.company
+    return {
+        'outreach_id': outreach.outreach_id,
+        'company_id': company.id if company else None,
+        'company_name': company.company_name if company else None,
+        'industry': company.industry if company else None,
+        'size': company.employee_size if company else None,
+        'location': company.location if company else None,
+        'decision_makers': company.decision_makers if company and company.decision_makers else {},
+        'outreach_status': outreach.status,
+        'outreach_email_id': outreach.email_id,
+        'outreach_date': str(outreach.outreach_date) if outreach.outreach_date else None
+    }
+
+
+def outreach_contexts_query(outreach_ids):
+    Outreach = apps.get_model('crewai_agents', 'Outreach')
+    return (Outreach.objects.filter(outreach_id__in=outreach_ids)
+            .select_related('company').only(*OUTREACH_CONTEXT_FIELDS))
+
+
+def fetch_outreach_contexts(outreach_ids):
+    """{outreach_id: context} for the given IDs, loaded with their companies in one query."""
+    return {outreach.outreach_id: outreach_context(outreach) for outreach in outreach_contexts_query(outreach_ids)}
+
+
+async def afetch_outreach_contexts(outreach_ids):
+    return {outreach.outreach_id: outreach_context(outreach) async for outreach in outreach_contexts_query(outreach_ids)}
+
+
+def outreach_request(outreach_ids):
+    """(single, ids to fetch, ids over the batch limit) from the tool input; raises ToolInputError."""
+    try:
+        data = parse_tool_input(outreach_ids, expect=dict, wrap="outreach_ids")
+        single = "outreach_id" in data or isinstance(data.get("outreach_ids"), (int, str))
+        ids = parse_tool_input(data, OutreachIdsInput)["outreach_ids"]
+    except ToolInputError:
+        raise ToolInputError(f"Invalid outreach_id format: {outreach_ids}. Please provide a numeric outreach ID or a list of them.") from None
+    if not ids:
+        raise ToolInputError("No outreach IDs given.")
+    limit = getattr(settings, "OUTREACH_BATCH_SIZE", 20)
+    return single, list(dict.fromkeys(ids[:limit])), ids[limit:]
+
+
+def outreach_result(single, ids, remaining, contexts):
+    if single:
+        return contexts.get(ids[0], f"Outreach with ID {ids[0]} not found.")
+    result = {
+        'count': len(contexts),
+        'outreaches': [contexts[outreach_id] for outreach_id in ids if outreach_id in contexts],
+        'not_found': [outreach_id for outreach_id in ids if outreach_id not in contexts],
+    }
+    if remaining:
+        result['not_fetched'] = remaining
+    return result
+
+
+def fetch_outreach_data(outreach_ids):
+    """
+    Fetch outreach data and associated company details for one outreach_id or a
+    list of them. A single ID returns its context; a list returns the contexts of
+    up to OUTREACH_BATCH_SIZE records, all loaded in one query.
+    """
+    try:
+        single, ids, remaining = outreach_request(outreach_ids)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    try:
+        contexts = fetch_outreach_contexts(ids)
+    except LookupError:
+        return "Error: Model not found in app registry. Check app label."
+    except Exception as e:
+        return f"Error fetching outreach data: {str(e)}"
+    return outreach_result(single, ids, remaining, contexts)
+
+
+async def afetch_outreach_data(outreach_ids):
+    try:
+        single, ids, remaining = outreach_request(outreach_ids)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    try:
+        contexts = await afetch_outreach_contexts(ids)
     except LookupError:
         return "Error: Model not found in app registry. Check app label."
     except Exception as e:
         return f"Error fetching outreach data: {str(e)}"
+    return outreach_result(single, ids, remaining, contexts)
 
 fetch_outreach_data_tool = Tool(
     name="fetch_outreach_data",
-    description="Fetch existing outreach data and its associated company details. Provide the outreach_id as an integer (e.g., 1).",
-    func=fetch_outreach_data
+    description="Fetch existing outreach data and associated company details. Provide one outreach_id as an integer "
+                "(e.g., 1) or a list of IDs (e.g., [1, 2, 3]) to get all their contexts at once.",
+    func=fetch_outreach_data,
+    coroutine=afetch_outreach_data,
 )
 
+def pending_outreach_ids_query():
+    Outreach = apps.get_model('crewai_agents', 'Outreach')
+    # Query for outreach records with 'pending' status (case-sensitive to match default)
+    return Outreach.objects.filter(status='pending').values_list('outreach_id', flat=True)
+
+
+def pending_outreach_result(outreach_ids):
+    if not outreach_ids:
+        return "No outreach records with pending status found."
+    return {
+        'count': len(outreach_ids),
+        'outreach_ids': outreach_ids
+    }
+
+
 def fetch_pending_outreach_ids(dummy_input=None):
     """Fetch a list of all outreach IDs that have status 'pending'."""
     try:
-        Outreach = apps.get_model('crewai_agents', 'Outreach')
-        
-        # Query for outreach records with 'pending' status (case-sensitive to match default)
-        pending_outreaches = Outreach.objects.filter(status='pending')
-        
-        # Extract outreach IDs
-        outreach_ids = [outreach.outreach_id for outreach in pending_outreaches]  # Use outreach_id field
-        
-        if not outreach_ids:
-            return "No outreach records with pending status found."
-        
-        return {
-            'count': len(outreach_ids),
-            'outreach_ids': outreach_ids
-        }
+        return pending_outreach_result(list(pending_outreach_ids_query()))
+    except Exception as e:
+        return f"Error fetching pending outreach IDs: {str(e)}"
+
+
+async def afetch_pending_outreach_ids(dummy_input=None):
+    try:
+        return pending_outreach_result([outreach_id async for outreach_id in pending_outreach_ids_query()])
     except Exception as e:
         return f"Error fetching pending outreach IDs: {str(e)}"
 
 fetching_pending_outreach_ids = Tool(
     name="fetch_pending_outreaches",
     description="Fetch a list of all outreach IDs that have status 'pending'.",
-    func=fetch_pending_outreach_ids
+    func=fetch_pending_outreach_ids,
+    coroutine=afetch_pending_outreach_ids,
 )
 
-def fetch_companies_without_decision_makers(_=None):
+def companies_without_decision_makers_query(after_id=0, limit=25):
+    """
+    Up to limit companies with no decision makers and an id above after_id, in id
+    order. The filter matches the partial index company_no_dm_id_idx, so a page is
+    an index range scan whatever the size of the backlog.
+    """
+    Company = apps.get_model('crewai_agents', 'Company')
+    from ...models.models import NO_DECISION_MAKERS
+    return (Company.objects.filter(NO_DECISION_MAKERS, id__gt=after_id).order_by('id')
+            .values('company_name', 'industry', 'location', company_id=F('id'), size=F('employee_size'))[:limit])
+
+
+def companies_without_decision_makers(after_id=0, limit=25):
+    return list(companies_without_decision_makers_query(after_id, limit))
+
+
+async def acompanies_without_decision_makers(after_id=0, limit=25):
+    return [company async for company in companies_without_decision_makers_query(after_id, limit)]
+
+
+def company_page(input_data):
+    """(after_id, limit) from the tool input; raises ToolInputError."""
+    if input_data is None or (isinstance(input_data, str) and input_data.strip().strip("`'\"").lower() in EMPTY_INPUTS):
+        input_data = {}
+    page = parse_tool_input(input_data, CompanyPageInput, wrap="after_id")
+    return page["after_id"], page.get("limit") or getattr(settings, "DECISION_MAKER_PAGE_SIZE", 25)
+
+
+def company_page_result(companies, after_id, limit):
+    if not companies:
+        return "No more companies without decision-makers." if after_id else "No companies found without decision-makers."
+    return {
+        'companies': companies,
+        # null once the backlog is exhausted
+        'next_after_id': companies[-1]['company_id'] if len(companies) == limit else None,
+    }
+
+
+def fetch_companies_without_decision_makers(input_data=None):
+    """
+    One page of companies with no decision makers. Input is optional: the
+    next_after_id of the previous page, or a dict with after_id and limit.
+    """
+    try:
+        after_id, limit = company_page(input_data)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    try:
+        companies = companies_without_decision_makers(after_id, limit)
+    except LookupError:
+        return "Error: Model 'Company' not found in app registry. Check app label."
+    except Exception as e:
+        return f"Error fetching companies: {str(e)}"
+    return company_page_result(companies, after_id, limit)
+
+
+async def afetch_companies_without_decision_makers(input_data=None):
+    try:
+        after_id, limit = company_page(input_data)
+    except ToolInputError as e:
+        return f"Error: {e}"
     try:
-        Company = apps.get_model('crewai_agents', 'Company')  
-        companies = Company.objects.filter(decision_makers__in=[[], None])
-        if not companies.exists():
-            return "No companies found without decision-makers."
-        
-        result = []
-        for company in companies:
-            result.append({
-                'company_id': company.id,
-                'company_name': company.company_name,
-                'size': company.employee_size,
-                'industry': company.industry,
-                'location': company.location,
-                'decision_makers': company.decision_makers if company.decision_makers else []
-            })
-        return result
+        companies = await acompanies_without_decision_makers(after_id, limit)
     except LookupError:
         return "Error: Model 'Company' not found in app registry. Check app label."
     except Exception as e:
         return f"Error fetching companies: {str(e)}"
+    return company_page_result(companies, after_id, limit)
 
 fetch_companies_tool = Tool(
     name="fetch_companies_without_decision_makers",
-    description="Fetches a list of companies with no decision-makers in their decision_makers JSON field.",
-    func=fetch_companies_without_decision_makers
+    description="Fetches one page of companies with no decision-makers in their decision_makers JSON field. "
+                "No input for the first page; then pass the returned next_after_id to get the next page.",
+    func=fetch_companies_without_decision_makers,
+    coroutine=afetch_companies_without_decision_makers,
+)
+
+def known_company_input(input_data):
+    """(company_name, website_url) from the tool input; raises ToolInputError."""
+    if isinstance(input_data, str) and input_data.strip().strip("`'\"").startswith("{"):
+        input_data = parse_tool_input(input_data, KnownCompanyInput)
+    elif isinstance(input_data, str):
+        input_data = input_data.strip().strip("`'\"")
+    if isinstance(input_data, dict):
+        company_name, website_url = input_data.get("company_name"), input_data.get("website_url")
+    elif " " not in input_data and "." in input_data:
+        company_name, website_url = None, input_data
+    else:
+        company_name, website_url = input_data, None
+    if not (company_name or website_url):
+        raise ToolInputError("provide a company_name and/or website_url.")
+    return company_name, website_url
+
+
+def known_company_answer(company, company_name, website_url):
+    if company is None:
+        return f"Not in the database: {company_name or website_url}. Research it."
+    return (f"Already known: {company.company_name} (company_id {company.id}, added {company.created_at}). "
+            f"Skip it and move on to the next company.")
+
+
+def check_known_company(input_data):
+    """
+    Input: a company name, a website URL, or a dict with company_name and/or website_url.
+    Answers whether the company is already stored, using one indexed query on the
+    canonical name key or the website domain.
+    """
+    try:
+        company_name, website_url = known_company_input(input_data)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    Company = apps.get_model('crewai_agents', 'Company')
+    company = Company.find_known(company_name=company_name, website_url=website_url)
+    return known_company_answer(company, company_name, website_url)
+
+
+async def acheck_known_company(input_data):
+    try:
+        company_name, website_url = known_company_input(input_data)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    Company = apps.get_model('crewai_agents', 'Company')
+    company = await Company.afind_known(company_name=company_name, website_url=website_url)
+    return known_company_answer(company, company_name, website_url)
+
+check_known_company_tool = Tool(
+    name="check_known_company",
+    description="Checks whether a company is already in the database before researching it. "
+                "Input: the company name, its website URL, or a JSON dict with company_name and website_url.",
+    func=check_known_company,
+    coroutine=acheck_known_company,
 )
 
+def save_decision_makers(company):
+    # The JSON and its DecisionMaker rows (rebuilt by the post_save signal) change together
+    with transaction.atomic():
+        company.save(update_fields=['decision_makers', 'last_updated'])
+
+
 def update_decision_makers(input_str):
-    print(f"DEBUG - Raw input: {repr(input_str)}")  
-    
-    if isinstance(input_str, str):
-        input_str = input_str.strip()
-        if input_str.startswith("```json"):
-            input_str = input_str[7:]
-        elif input_str.startswith("```"):
-            input_str = input_str[3:]
-        if input_str.endswith("```"):
-            input_str = input_str[:-3]
-        input_str = input_str.strip()
-        print(f"DEBUG - Stripped input: {repr(input_str)}")
-    
     try:
-        data = json.loads(input_str)
-        print(f"DEBUG - Parsed data: {data}")
-        
-        company_id = data['company_id']
-        decision_makers = data['decision_makers']
-        
-        # Normalize 'title' to 'role' to match model expectations
-        for dm in decision_makers:
-            if 'title' in dm and 'role' not in dm:
-                dm['role'] = dm.pop('title')
-                print(f"DEBUG - Normalized 'title' to 'role': {dm}")
-        
+        data = parse_tool_input(input_str, DecisionMakersInput)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    company_id = data['company_id']
+    try:
         Company = apps.get_model('crewai_agents', 'Company')
         company = Company.objects.get(id=company_id)
-        company.decision_makers = decision_makers
-        company.save()
+        company.decision_makers = data['decision_makers']
+        save_decision_makers(company)
+        return f"Updated decision_makers for {company.company_name} (ID: {company_id})"
+    except ObjectDoesNotExist:
+        return f"Error: Company with ID {company_id} not found."
+    except Exception as e:
+        return f"Error updating company ID {company_id}: {str(e)}"
+
+
+async def aupdate_decision_makers(input_str):
+    try:
+        data = parse_tool_input(input_str, DecisionMakersInput)
+    except ToolInputError as e:
+        return f"Error: {e}"
+    company_id = data['company_id']
+    try:
+        Company = apps.get_model('crewai_agents', 'Company')
+        company = await Company.objects.aget(id=company_id)
+        company.decision_makers = data['decision_makers']
+        # The save and its signal share a transaction, which the async ORM cannot open
+        await sync_to_async(save_decision_makers)(company)
         return f"Updated decision_makers for {company.company_name} (ID: {company_id})"
-    except json.JSONDecodeError as e:
-        return f"Error: Invalid JSON input: {repr(input_str)} - {str(e)}"
-    except KeyError as e:
-        return f"Error: Missing required field {str(e)} in input: {repr(input_str)}"
     except ObjectDoesNotExist:
         return f"Error: Company with ID {company_id} not found."
     except Exception as e:
         return f"Error updating company ID {company_id}: {str(e)}"
 
+
 update_decision_makers_tool = Tool(
     name="update_decision_makers",
     description="Updates the decision_makers JSON field for a company. Input is a JSON string with 'company_id' (int) and 'decision_makers' (list of dicts with 'name', 'role', 'email', 'phone', 'linkedin_profile', 'preferred_contact', 'last_contact_date', 'notes').",
-    func=update_decision_makers
+    func=update_decision_makers,
+    coroutine=aupdate_decision_makers,
 )
\ No newline at end of file
@@ -0,0 +1,139 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseCache:
+    """
+    Base of the persistent caches kept in a table with key, expires_at,
+    last_accessed_at and hit_count columns (LLMCacheEntry, SearchCacheEntry).
+
+    Subclasses name the model, the column holding the cached value and the
+    settings prefix (<prefix>_ENABLED, <prefix>_TTL, <prefix>_MAX_ENTRIES). Expired
+    entries and the least recently used ones beyond max_entries are evicted after
+    writes, once an hour or sooner when this process has written more than
+    overflow_margin * max_entries entries since the last eviction. max_entries is
+    therefore a soft cap: between evictions each process can grow the table by at
+    most that margin.
+    """
+
+    entry_model = ""
+    value_field = ""
+    setting_prefix = ""
+    label = "Cache"
+    overflow_margin = 0.1
+
+    def __init__(self, ttl=None, max_entries=None):
+        # Settings are read lazily so the cache can be built before django.setup()
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._evicted_at = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return getattr(settings, f"{self.setting_prefix}_ENABLED", True)
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else getattr(settings, f"{self.setting_prefix}_TTL", 0)
+
+    @property
+    def max_entries(self):
+        if self._max_entries is not None:
+            return self._max_entries
+        return getattr(settings, f"{self.setting_prefix}_MAX_ENTRIES", 0)
+
+    def _entries(self):
+        return apps.get_model('crewai_agents', self.entry_model).objects
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch(self, key, decode=None):
+        """The unexpired value stored under key (passed through decode), or None on a miss."""
+        if not self.enabled:
+            return None
+        now = timezone.now()
+        try:
+            entries = self._entries()
+            entry = entries.filter(key=key).values_list('id', self.value_field, 'expires_at').first()
+            if entry is None or (entry[2] is not None and entry[2] <= now):
+                self._count('misses')
+                return None
+            entries.filter(id=entry[0]).update(hit_count=F('hit_count') + 1, last_accessed_at=now)
+            value = decode(entry[1]) if decode is not None else entry[1]
+        except Exception as e:
+            logger.warning("%s lookup failed: %s", self.label, e)
+            self._count('misses')
+            return None
+        self._count('hits')
+        return value
+
+    def store(self, key, value, **fields):
+        """Insert or replace the entry for key, then evict when due."""
+        if not self.enabled:
+            return
+        now = timezone.now()
+        try:
+            self._entries().update_or_create(
+                key=key,
+                defaults={
+                    **fields,
+                    self.value_field: value,
+                    "last_accessed_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl) if self.ttl else None,
+                },
+            )
+            with self._lock:
+                self._writes += 1
+            self.evict(now)
+        except Exception as e:
+            logger.warning("%s update failed: %s", self.label, e)
+
+    def evict(self, now=None):
+        """
+        Delete expired entries, then the least recently used ones over max_entries.
+        The overflow query scans the whole table, so it runs at most once an hour
+        unless this process's writes since the last eviction exceed the margin.
+        """
+        now = now or timezone.now()
+        margin = max(1, int(self.max_entries * self.overflow_margin)) if self.max_entries else None
+        with self._lock:
+            recent = self._evicted_at is not None and now - self._evicted_at < timedelta(hours=1)
+            if recent and (margin is None or self._writes <= margin):
+                return 0
+            self._evicted_at, self._writes = now, 0
+        entries = self._entries()
+        deleted, _ = entries.filter(expires_at__lte=now).delete()
+        if self.max_entries:
+            overflow = list(
+                entries.order_by('-last_accessed_at').values_list('id', flat=True)[self.max_entries:]
+            )
+            if overflow:
+                deleted += entries.filter(id__in=overflow).delete()[0]
+        return deleted
+
+    def clear(self, **kwargs):
+        self._entries().all().delete()
+
+    def stats(self):
+        """Hit/miss counters for this process plus the persisted entry count."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._entries().count(),
+        }
@@ -0,0 +1,138 @@
+import ast
+import logging
+import re
+
+import orjson
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Longest Action Input the repair path will work on; valid JSON of any size still takes the fast path
+MAX_REPAIR_CHARS = 100_000
+
+CODE_FENCE = re.compile(r"^```[A-Za-z]*\s*(.*?)\s*```$", re.DOTALL)
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class ToolInputError(ValueError):
+    """Action Input that could not be parsed, or that does not match the tool's schema."""
+
+
+def strip_wrapping(text):
+    """Drop whitespace, a Markdown code fence and backticks or quotes wrapped around a JSON value."""
+    text = text.strip()
+    match = CODE_FENCE.match(text)
+    if match:
+        text = match.group(1)
+    while len(text) > 1 and text[0] == text[-1] and text[0] in "`'\"" and text[1:2] in "{[`'\"":
+        text = text[1:-1].strip()
+    return text
+
+
+def outermost_value(text):
+    """The span from the first opening bracket to the last matching closing one (drops surrounding prose)."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    return text[start:end + 1] if end > start else text
+
+
+def python_style(text):
+    """True when the first quoted string uses single quotes, i.e. text looks like a Python dict."""
+    single, double = text.find("'"), text.find('"')
+    return single != -1 and (double == -1 or single < double)
+
+
+def literal(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+
+
+def json_or_none(text):
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def loads(text):
+    """
+    Parse an LLM Action Input. Valid JSON is decoded by orjson directly; anything
+    else goes through a bounded repair path (code fences, wrapping quotes, prose
+    around the value, escaped quotes, trailing commas, Python literals and single
+    quotes) that inspects the text once and tries at most four decodes.
+    Raises ToolInputError when no repair yields a value.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    if len(text) > MAX_REPAIR_CHARS:
+        raise ToolInputError(f"Input is not valid JSON ({len(text)} characters, too long to repair).")
+
+    repaired = outermost_value(strip_wrapping(text))
+    if '\\"' in repaired:
+        repaired = repaired.replace('\\"', '"')
+    if python_style(repaired):
+        # Python dict syntax: single quotes, True/None, apostrophes inside double-quoted strings
+        attempts = (literal, json_or_none)
+    else:
+        attempts = (json_or_none, literal)
+    for attempt in attempts:
+        value = attempt(repaired)
+        if value is None and attempt is json_or_none and TRAILING_COMMA.search(repaired):
+            value = json_or_none(TRAILING_COMMA.sub(r"\1", repaired))
+        if value is not None:
+            logger.debug("Repaired tool input with %s: %.200r", attempt.__name__, text)
+            return value
+    try:
+        value = orjson.loads(repaired.replace("'", '"'))
+    except orjson.JSONDecodeError as e:
+        raise ToolInputError(f"Input is not valid JSON: {e}") from None
+    logger.debug("Parsed tool input after replacing single quotes: %.200r", text)
+    return value
+
+
+def parse_tool_input(data, schema=None, expect=dict, wrap=None):
+    """
+    Parse and validate the input of a database tool.
+
+    data is the raw Action Input (a string) or an already decoded value (tool-calling
+    mode). A decoded value of another type than expect is wrapped as {wrap: value}
+    when wrap is given, so a bare ID still reaches the schema. With a pydantic schema
+    each dict (or each dict of a list) is validated, coerced and completed with the
+    schema's defaults; keys the schema does not declare are dropped, so only checked
+    values reach the database. Raises ToolInputError with an agent-readable message.
+    """
+    if isinstance(data, str):
+        data = loads(data)
+    if wrap is not None and not isinstance(data, expect):
+        data = {wrap: data}
+    if not isinstance(data, expect):
+        raise ToolInputError(f"Input must be {describe(expect)}, got {type(data).__name__}.")
+    if schema is None:
+        return data
+    if isinstance(data, list):
+        return [validate(item, schema) for item in data]
+    return validate(data, schema)
+
+
+def validate(item, schema):
+    if not isinstance(item, dict):
+        raise ToolInputError(f"Each item must be a dict, got {type(item).__name__}.")
+    try:
+        validated = schema.model_validate(item)
+    except ValidationError as e:
+        problems = "; ".join(f"{'.'.join(map(str, error['loc'])) or 'input'}: {error['msg']}" for error in e.errors())
+        raise ToolInputError(f"Invalid input for {schema.__name__}: {problems}") from None
+    return validated.model_dump()
+
+
+def describe(expect):
+    names = {dict: "a dict", list: "a list", int: "an integer", str: "a string"}
+    types = expect if isinstance(expect, tuple) else (expect,)
+    return " or ".join(names.get(t, t.__name__) for t in types)
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+
+import redis
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Refill the bucket for the elapsed time, then take a token. Blocking callers
+# reserve the token even when the bucket is empty (tokens go negative) and are
+# told how long to sleep, so waiters are served in order without polling.
+# Redis TIME is used so every worker shares one clock.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then
+  wait = (1 - tokens) / rate
+end
+if wait == 0 or ARGV[3] == '1' then
+  tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 60)
+return tostring(wait)
+"""
+
+
+class LocalTokenBucket:
+    """In-process token buckets, used when Redis is not configured or unreachable."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, name, rate, capacity, block=True):
+        """Take a token from the bucket for name; return the seconds to wait for it."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(name, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            wait = (1 - tokens) / rate if tokens < 1 else 0.0
+            if not wait or block:
+                tokens -= 1
+            self._buckets[name] = (tokens, now)
+        return wait
+
+
+class RedisTokenBucket:
+    """Token buckets shared by every worker through Redis."""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, name, rate, capacity, block=True):
+        return float(self.script(keys=[f"ratelimit:{name}"], args=[rate, capacity, int(block)]))
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter keyed by tool or model name.
+
+    Rates come from the active ToolConfig rows (rate_limit, requests per minute, 0
+    for unlimited) and are re-read every RATE_LIMIT_REFRESH_SECONDS. Callers wait
+    for a token instead of failing; the time spent waiting is recorded per name.
+    """
+
+    def __init__(self, backend=None):
+        # Settings are read lazily so the limiter can be built before django.setup()
+        self._backend = backend
+        self._local = LocalTokenBucket()
+        self._lock = threading.Lock()
+        self._rates = {}
+        self._rates_loaded_at = None
+        self._redis_retry_at = 0.0
+        self.waits = defaultdict(lambda: {"calls": 0, "throttled": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0})
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    if getattr(settings, "RATE_LIMIT_BACKEND", "redis") == "redis":
+                        url = getattr(settings, "RATE_LIMIT_REDIS_URL", settings.CELERY_BROKER_URL)
+                        self._backend = RedisTokenBucket(url)
+                    else:
+                        self._backend = self._local
+        return self._backend
+
+    def rates(self):
+        """{name: requests per minute} from the active ToolConfig rows."""
+        now = time.monotonic()
+        refresh = getattr(settings, "RATE_LIMIT_REFRESH_SECONDS", 60)
+        if self._rates_loaded_at is None or now - self._rates_loaded_at >= refresh:
+            ToolConfig = apps.get_model('crewai_agents', 'ToolConfig')
+            try:
+                self._rates = dict(
+                    ToolConfig.objects.filter(is_active=True, rate_limit__gt=0).values_list('name', 'rate_limit')
+                )
+            except DatabaseError as e:
+                logger.warning("Could not load tool rate limits, keeping the previous ones: %s", e)
+            self._rates_loaded_at = now
+        return self._rates
+
+    def capacity(self, per_minute):
+        """Burst size: RATE_LIMIT_BURST_SECONDS worth of tokens, at least one."""
+        return max(1, math.ceil(per_minute / 60 * getattr(settings, "RATE_LIMIT_BURST_SECONDS", 10)))
+
+    def _take(self, name, per_minute, block):
+        rate, capacity = per_minute / 60, self.capacity(per_minute)
+        backend = self.backend
+        if backend is not self._local and time.monotonic() >= self._redis_retry_at:
+            try:
+                return backend.take(name, rate, capacity, block)
+            except redis.RedisError as e:
+                logger.warning("Redis rate limiter unavailable, using in-process buckets for 30s: %s", e)
+                self._redis_retry_at = time.monotonic() + 30
+        return self._local.take(name, rate, capacity, block)
+
+    def reserve(self, name, block=True):
+        """Take a token for name; return the seconds the caller has to wait for it (0 when unlimited)."""
+        per_minute = self.rates().get(name)
+        if not per_minute:
+            return 0.0
+        wait = self._take(name, per_minute, block)
+        if block:
+            self.record(name, wait)
+        return wait
+
+    def record(self, name, wait):
+        with self._lock:
+            metric = self.waits[name]
+            metric["calls"] += 1
+            if wait > 0:
+                metric["throttled"] += 1
+                metric["wait_seconds"] += wait
+                metric["max_wait_seconds"] = max(metric["max_wait_seconds"], wait)
+        if wait > 0:
+            logger.debug("Rate limited %s, waiting %.2fs", name, wait)
+
+    def acquire(self, name, blocking=True):
+        wait = self.reserve(name, block=blocking)
+        if wait and not blocking:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, name, blocking=True):
+        wait = await asyncio.to_thread(self.reserve, name, blocking)
+        if wait and not blocking:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+    def stats(self):
+        """Per-name call, throttle and wait-time counters for this process."""
+        with self._lock:
+            return {name: dict(metric) for name, metric in self.waits.items()}
+
+
+class ModelRateLimiter(BaseRateLimiter):
+    """LangChain rate limiter for a chat model; only API requests are limited, cache hits are not."""
+
+    def __init__(self, limiter, name):
+        self.limiter = limiter
+        self.name = name
+
+    def acquire(self, *, blocking=True):
+        return self.limiter.acquire(self.name, blocking=blocking)
+
+    async def aacquire(self, *, blocking=True):
+        return await self.limiter.aacquire(self.name, blocking=blocking)
+
+
+class ToolRateLimitHandler(BaseCallbackHandler):
+    """Callback that takes a token for a tool before it runs, keyed by tool name."""
+
+    # Sync runs call this in the tool's thread; async runs await it in a worker thread
+    # before the tool starts, so the wait delays the call without blocking the event loop
+    run_inline = False
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.limiter.acquire(serialized["name"])
@@ -0,0 +1,102 @@
+from typing import List, Literal, Optional
+
+from pydantic import AliasChoices, BaseModel, Field, field_validator, model_validator
+
+
+class CompanyInput(BaseModel):
+    """Arguments for company_update."""
+    company_name: str = Field(max_length=255, description="Full legal name of the company")
+    size: int = Field(validation_alias=AliasChoices("size", "employee_size"), description="Number of employees")
+    industry: str = Field(max_length=255, description="Primary industry category")
+    location: str = Field(max_length=255, description="Specific location within DFW")
+    stress_score: Optional[float] = Field(default=None, validation_alias=AliasChoices("stress_score", "stress_level_score"),
+                                          description="Estimated stress level from 1-10")
+    website_url: Optional[str] = Field(default=None, max_length=200, description="Official website")
+    revenue_growth: Optional[float] = Field(default=None, description="Year-over-year revenue growth in percent")
+    wellness_culture_score: Optional[float] = Field(default=None, description="Strength of the wellness culture from 1-10")
+    priority_score: Optional[float] = Field(default=None, description="Outreach priority from 1-10")
+    targeting_reason: Optional[str] = Field(default=None, description="Why the company is a good target")
+    notes: Optional[str] = Field(default=None, description="Additional information")
+
+
+class CompanyBatchInput(BaseModel):
+    """Arguments for company_update in tool-calling mode (one call saves several companies)."""
+    companies: List[CompanyInput] = Field(min_length=1, description="Companies to create or update")
+
+
+class KnownCompanyInput(BaseModel):
+    """Arguments for check_known_company."""
+    company_name: Optional[str] = Field(default=None, description="Company name as found")
+    website_url: Optional[str] = Field(default=None, description="Company website, if known")
+
+
+class CompetitorTrendInput(BaseModel):
+    """Arguments for competitor_trend_update."""
+    competitor_name: str = Field(description="Name of the competitor")
+    trend_description: str = Field(description="Description of the observed trend")
+    impact_level: Literal["High", "Medium", "Low"] = Field(description="Impact of the trend on our business")
+
+    @field_validator("impact_level", mode="before")
+    @classmethod
+    def capitalize_impact(cls, value):
+        return value.strip().capitalize() if isinstance(value, str) else value
+
+
+class EmailTemplateInput(BaseModel):
+    name: str = Field(description="Brief descriptive template name")
+    subject: str = Field(description="Email subject line")
+    content: str = Field(description="Full personalized email body")
+    recipient: Optional[str] = Field(default=None, description="Primary decision maker's email address")
+
+
+class OutreachLogInput(BaseModel):
+    """Arguments for outreach_log."""
+    outreach_id: int = Field(description="Numeric ID of the outreach record")
+    email_template_data: EmailTemplateInput
+
+
+class DecisionMakerContact(BaseModel):
+    name: str = Field(description="Full name")
+    role: str = Field(description="Job title, e.g. CEO")
+    email: str = Field(default="email@example.com", description="Email address")
+    phone: str = Field(default="N/A", description="Phone number")
+    linkedin_profile: str = Field(default="N/A", description="LinkedIn profile URL")
+    preferred_contact: str = Field(default="N/A", description="Email, Phone, LinkedIn or N/A")
+    last_contact_date: str = Field(default="2025-02-27", description="YYYY-MM-DD")
+    notes: str = Field(default="N/A", description="Additional information")
+
+    @model_validator(mode="before")
+    @classmethod
+    def normalize_keys(cls, data):
+        """Accept 'title' for role and treat null fields as not given."""
+        if isinstance(data, dict):
+            data = {key: value for key, value in data.items() if value is not None}
+            if "title" in data and "role" not in data:
+                data["role"] = data.pop("title")
+        return data
+
+
+class CompanyPageInput(BaseModel):
+    """Arguments for fetch_companies_without_decision_makers."""
+    after_id: int = Field(default=0, ge=0, description="next_after_id of the previous page; 0 for the first page")
+    limit: Optional[int] = Field(default=None, ge=1, le=100, description="Companies per page")
+
+
+class DecisionMakersInput(BaseModel):
+    """Arguments for update_decision_makers."""
+    company_id: int = Field(description="company_id returned by fetch_companies_without_decision_makers")
+    decision_makers: List[DecisionMakerContact]
+
+
+class OutreachIdsInput(BaseModel):
+    """Arguments for fetch_outreach_data."""
+    outreach_ids: List[int] = Field(validation_alias=AliasChoices("outreach_ids", "outreach_id"),
+                                    description="Numeric IDs of the outreach records")
+
+    @field_validator("outreach_ids", mode="before")
+    @classmethod
+    def listify(cls, value):
+        """Accept a single ID as well as a list of them."""
+        if isinstance(value, (int, str)):
+            return [value]
+        return list(value) if isinstance(value, tuple) else value
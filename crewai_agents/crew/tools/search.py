@@ -0,0 +1,464 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, List, Optional, Union
+
+import httpx
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from langchain.tools import BaseTool
+from langchain_core.callbacks import CallbackManagerForToolRun
+from pydantic import BaseModel, Field
+
+from .db_cache import DatabaseCache
+
+logger = logging.getLogger(__name__)
+
+# DFW location qualifiers the agent prompts ask for; matched longest first
+LOCATION_QUALIFIERS = (
+    "dallas-fort worth", "dallas fort worth", "dfw metroplex", "dfw area", "dfw", "north dallas",
+    "downtown fort worth", "las colinas business district", "las colinas", "fort worth", "dallas",
+    "plano", "irving", "frisco", "arlington", "richardson", "mckinney", "addison", "denton",
+    "grapevine", "southlake", "allen", "garland", "carrollton", "lewisville", "texas", "tx",
+)
+_LOCATIONS = re.compile(
+    r"\b(?:" + "|".join(re.escape(q) for q in sorted(LOCATION_QUALIFIERS, key=len, reverse=True)) + r")\b"
+)
+_WHITESPACE = re.compile(r"\s+")
+_SEPARATORS = re.compile(r"\s*,\s*|\s+")
+
+
+def normalize_query(query):
+    """
+    Lowercase the query, collapse whitespace and move location qualifiers to the
+    end in sorted order, so "Fast-growing companies in Dallas TX" and
+    "fast-growing companies in TX  Dallas" share a cache entry.
+    """
+    query = _WHITESPACE.sub(" ", query.lower()).strip().strip("\"'?.!")
+    locations = sorted(set(_LOCATIONS.findall(query)))
+    rest = _SEPARATORS.sub(" ", _LOCATIONS.sub(" ", query)).strip(" ,")
+    return f"{rest} | {' '.join(locations)}" if locations else rest
+
+
+class SearchResultCache(DatabaseCache):
+    """
+    Persistent search-result cache backed by the SearchCacheEntry table.
+
+    Entries are keyed on the normalized query and the search parameters. Expiry
+    and the SEARCH_CACHE_MAX_ENTRIES soft cap are handled by DatabaseCache.
+    """
+
+    entry_model = "SearchCacheEntry"
+    value_field = "results"
+    setting_prefix = "SEARCH_CACHE"
+    label = "Search cache"
+
+    def make_key(self, query, params):
+        normalized = normalize_query(query)
+        payload = json.dumps({"q": normalized, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest(), normalized
+
+    def get(self, query, params):
+        key, _ = self.make_key(query, params)
+        return self.fetch(key)
+
+    def set(self, query, params, results):
+        key, normalized = self.make_key(query, params)
+        self.store(key, results, query=normalized[:500], search_type=params.get("type") or "search")
+
+
+def result_key(result):
+    """Identity of a search result: its URL without scheme/www/fragment, else its snippet hash."""
+    link = (result.get("link") or "").strip().lower()
+    if link:
+        return "url:" + re.sub(r"^https?://(www\.)?", "", link).split("#", 1)[0].rstrip("/")
+    snippet = _WHITESPACE.sub(" ", (result.get("snippet") or "").lower()).strip()
+    return "snippet:" + hashlib.sha1(snippet.encode("utf-8")).hexdigest()
+
+
+def truncate(text, limit):
+    text = _WHITESPACE.sub(" ", text or "").strip()
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class SearchCompactor:
+    """
+    Turns raw Serper results into a compact observation: title, URL and a
+    truncated snippet per result, within SEARCH_OBSERVATION_CHARS. Results
+    already shown earlier in the same agent run (keyed by the executor's run id)
+    are dropped, so overlapping queries do not repeat them in the scratchpad.
+    """
+
+    def __init__(self, max_runs=256):
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._seen = OrderedDict()
+
+    @property
+    def enabled(self):
+        return getattr(settings, "SEARCH_COMPACTION_ENABLED", True)
+
+    def seen_for(self, run_manager):
+        """Keys already shown in the agent run that invoked the tool (a fresh set outside a run)."""
+        run_id = getattr(run_manager, "parent_run_id", None)
+        if run_id is None:
+            return set()
+        with self._lock:
+            seen = self._seen.get(run_id)
+            if seen is None:
+                # No end-of-run hook here, so only the most recent runs are remembered
+                seen = self._seen[run_id] = set()
+                while len(self._seen) > self.max_runs:
+                    self._seen.popitem(last=False)
+            else:
+                self._seen.move_to_end(run_id)
+            return seen
+
+    def candidates(self, search, results):
+        answer_box = results.get("answerBox")
+        if answer_box:
+            yield {"title": answer_box.get("title"), "link": answer_box.get("link"),
+                   "snippet": answer_box.get("answer") or answer_box.get("snippet")}
+        graph = results.get("knowledgeGraph")
+        if graph:
+            yield {"title": graph.get("title"), "link": graph.get("descriptionLink") or graph.get("website"),
+                   "snippet": graph.get("description")}
+        yield from results.get(search.result_key_for_type[search.type], [])[:search.k]
+
+    def compact(self, search, results, seen):
+        """Observation for results, skipping (and then recording) the keys in seen."""
+        budget = getattr(settings, "SEARCH_OBSERVATION_CHARS", 2000)
+        snippet_chars = getattr(settings, "SEARCH_SNIPPET_CHARS", 200)
+        lines, used, repeated = [], 0, 0
+        for result in self.candidates(search, results):
+            key = result_key(result)
+            if key in seen:
+                repeated += 1
+                continue
+            header = " | ".join(part for part in (truncate(result.get("title"), 120), result.get("link")) if part)
+            snippet = truncate(result.get("snippet"), snippet_chars)
+            if not (header or snippet):
+                continue
+            line = f"- {header}\n  {snippet}" if header and snippet else f"- {header or snippet}"
+            if lines and used + len(line) > budget:
+                break
+            with self._lock:
+                seen.add(key)
+            lines.append(line)
+            used += len(line) + 1
+        if repeated:
+            lines.append(f"({repeated} results already seen in this run omitted)")
+        return "\n".join(lines) if lines else "No good Google Search Result was found"
+
+
+class SearchLedger:
+    """
+    Per-agent record of issued queries and the results they returned, kept in the
+    SearchQueryLedger table. When an agent repeats a query from an earlier run,
+    the results it reviewed then are removed, so daily runs only see the delta.
+    Entries unused for SEARCH_LEDGER_MAX_AGE_DAYS are ignored and evicted.
+    """
+
+    # Result identities remembered per query
+    max_keys = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._evicted_at = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, "SEARCH_LEDGER_ENABLED", True)
+
+    @property
+    def max_age(self):
+        return timedelta(days=getattr(settings, "SEARCH_LEDGER_MAX_AGE_DAYS", 30))
+
+    def _entries(self):
+        return apps.get_model('crewai_agents', 'SearchQueryLedger').objects
+
+    def apply(self, agent_name, query, search, results, run_id=None):
+        """
+        Record the query for agent_name and return (results, note). Results reviewed
+        in an earlier run are dropped from the result list and counted in note; when
+        nothing new is left, results is None and note says since when.
+        """
+        if not (self.enabled and agent_name):
+            return results, None
+        list_key = search.result_key_for_type[search.type]
+        items = results.get(list_key, [])[:search.k]
+        normalized = normalize_query(query)
+        query_key = hashlib.sha256(f"{search.type}|{normalized}".encode("utf-8")).hexdigest()
+        run_id = str(run_id or "")
+        now = timezone.now()
+        note = None
+        try:
+            for attempt in range(2):
+                try:
+                    with transaction.atomic():
+                        results, note = self._record(agent_name, query_key, normalized, list_key, items,
+                                                     results, run_id, now)
+                    break
+                except IntegrityError:
+                    # Another run created the entry between the lookup and the insert: apply on top of it
+                    if attempt:
+                        raise
+            self.evict(now)
+        except Exception as e:
+            logger.warning("Search ledger update failed: %s", e)
+        return results, note
+
+    def _record(self, agent_name, query_key, normalized, list_key, items, results, run_id, now):
+        """
+        The read-modify-write of apply(), run in a transaction with the entry row
+        locked, so concurrent runs of the same query do not lose each other's
+        result keys.
+        """
+        entries = self._entries()
+        keys = [result_key(item) for item in items]
+        entry = entries.select_for_update().filter(agent_name=agent_name, query_key=query_key).first()
+        fresh = entry is not None and entry.last_run_at > now - self.max_age
+        reviewed = set(entry.result_keys) if fresh else set()
+        note = None
+        if fresh and (not run_id or entry.run_id != run_id):
+            new_items = [item for item, key in zip(items, keys) if key not in reviewed]
+            omitted = len(items) - len(new_items)
+            if omitted and not new_items:
+                note = (f"No new results since {entry.last_run_at:%Y-%m-%d}: all {omitted} results for this "
+                        f"query were reviewed in an earlier run. Try a different query.")
+                results = None
+            elif omitted:
+                note = f"({omitted} results reviewed in an earlier run on {entry.last_run_at:%Y-%m-%d} omitted)"
+                results = {**results, list_key: new_items}
+
+        merged = [*(entry.result_keys if fresh else []), *(key for key in keys if key not in reviewed)]
+        if entry is None:
+            entries.create(agent_name=agent_name, query_key=query_key, query=normalized[:500],
+                           result_keys=merged[-self.max_keys:], run_id=run_id, last_run_at=now)
+        else:
+            entries.filter(id=entry.id).update(result_keys=merged[-self.max_keys:], run_id=run_id,
+                                               last_run_at=now, run_count=F('run_count') + 1)
+        return results, note
+
+    def evict(self, now=None):
+        """Delete entries unused for max_age (at most once an hour per process)."""
+        now = now or timezone.now()
+        with self._lock:
+            if self._evicted_at is not None and now - self._evicted_at < timedelta(hours=1):
+                return 0
+            self._evicted_at = now
+        return self._entries().filter(last_run_at__lt=now - self.max_age).delete()[0]
+
+
+class WebSearchTool(BaseTool):
+    name: str = "web_search"
+    description: str = "Search the web for market trends, company info, or contacts."
+    search: Any
+    cache: Any = None
+    # Applied on cache misses only, so cached observations are not throttled
+    rate_limiter: Any = None
+    compactor: Any = None
+    ledger: Any = None
+    # Registry name of the agent using this instance, for the query ledger
+    agent_name: str = ""
+
+    def search_params(self):
+        return {"gl": self.search.gl, "hl": self.search.hl, "num": self.search.k,
+                "tbs": self.search.tbs, "type": self.search.type}
+
+    def results(self, query):
+        """Raw Serper results for query, served from the cache when possible."""
+        params = self.search_params()
+        if self.cache is not None:
+            cached = self.cache.get(query, params)
+            if cached is not None:
+                return cached
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self.name)
+        results = self.search.results(query)
+        if self.cache is not None:
+            self.cache.set(query, params, results)
+        return results
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        results, note = self.results(query), None
+        if self.ledger is not None:
+            results, note = self.ledger.apply(self.agent_name, query, self.search, results,
+                                              getattr(run_manager, "parent_run_id", None))
+            if results is None:
+                return note
+        if self.compactor is None or not self.compactor.enabled:
+            observation = self.search._parse_results(results)
+        else:
+            observation = self.compactor.compact(self.search, results, self.compactor.seen_for(run_manager))
+        return f"{observation}\n{note}" if note else observation
+
+
+class SerperAsyncClient:
+    """
+    Pooled async HTTP client for the Serper API. The httpx client lives on a
+    private event loop thread, so sync tool calls and async agents share one
+    connection pool and issue their queries concurrently.
+    """
+
+    base_url = "https://google.serper.dev"
+
+    def __init__(self, api_key, max_connections=10, timeout=30.0):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="serper-client", daemon=True).start()
+        return self._loop
+
+    def _http(self):
+        # Only called on the client's loop, so no lock is needed
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"X-API-KEY": self.api_key or "", "Content-Type": "application/json"},
+                limits=httpx.Limits(max_connections=self.max_connections),
+                timeout=self.timeout,
+            )
+        return self._client
+
+    async def _search(self, query, search_type, params):
+        response = await self._http().post(
+            f"/{search_type}", params={"q": query, **{key: value for key, value in params.items() if value is not None}}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def run(self, coro):
+        """Schedule coro on the client's loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def submit(self, query, search_type="search", **params):
+        """Schedule a Serper search on the pooled connection."""
+        return self.run(self._search(query, search_type, params))
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+class MultiSearchInput(BaseModel):
+    queries: Union[List[str], str] = Field(description="List of search queries to run at once")
+
+
+def parse_queries(queries):
+    """Queries from a list, a JSON array string or a newline/semicolon separated string."""
+    if isinstance(queries, str):
+        text = queries.strip().strip("`'\"").strip()
+        if text.startswith("["):
+            try:
+                queries = json.loads(text)
+            except ValueError:
+                # Unquoted list such as [query one, query two]
+                queries = text.strip("[]").split(",")
+        else:
+            queries = re.split(r"[\n;]+", text)
+    queries = (str(query).strip().strip("`'\"").strip() for query in queries)
+    return [query for query in queries if query]
+
+
+class MultiWebSearchTool(BaseTool):
+    name: str = "multi_web_search"
+    description: str = (
+        "Run several web searches at once. Input should be a JSON list of search queries, "
+        'e.g. ["fast-growing companies in Dallas TX", "high-stress workplaces DFW area"]. '
+        "Returns the results labelled per query."
+    )
+    args_schema: Any = MultiSearchInput
+    search: Any
+    client: Any
+    cache: Any = None
+    rate_limiter: Any = None
+    max_queries: int = 5
+    compactor: Any = None
+    ledger: Any = None
+    agent_name: str = ""
+    # Send searches through search.aresults (record/replay cassettes) instead of the pooled connection
+    use_wrapper: bool = False
+
+    def _fetch(self, query):
+        """Future for the raw results of one query, rate limited like web_search."""
+        if self.rate_limiter is not None:
+            # Same Serper quota as web_search
+            self.rate_limiter.acquire(WebSearchTool.model_fields["name"].default)
+        if self.use_wrapper:
+            return self.client.run(self.search.aresults(query))
+        return self.client.submit(query, self.search.type, gl=self.search.gl, hl=self.search.hl,
+                                  num=self.search.k, tbs=self.search.tbs)
+
+    def search_all(self, queries):
+        """{query: raw results or exception}, with cache hits answered without a request."""
+        params = {"gl": self.search.gl, "hl": self.search.hl, "num": self.search.k,
+                  "tbs": self.search.tbs, "type": self.search.type}
+        unique = {}
+        for query in parse_queries(queries)[:self.max_queries]:
+            unique.setdefault(normalize_query(query), query)
+
+        results, pending = {}, {}
+        for query in unique.values():
+            cached = self.cache.get(query, params) if self.cache is not None else None
+            if cached is not None:
+                results[query] = cached
+            else:
+                pending[query] = self._fetch(query)
+        for query, future in pending.items():
+            try:
+                results[query] = future.result()
+            except Exception as e:
+                logger.warning("Search failed for %r: %s", query, e)
+                results[query] = e
+                continue
+            if self.cache is not None:
+                self.cache.set(query, params, results[query])
+        return {query: results[query] for query in unique.values()}
+
+    def _run(self, queries: Union[List[str], str], run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        results = self.search_all(queries)
+        if not results:
+            return "No queries given. Input should be a JSON list of search queries."
+        compact = self.compactor is not None and self.compactor.enabled
+        seen = self.compactor.seen_for(run_manager) if compact else None
+        run_id = getattr(run_manager, "parent_run_id", None)
+        sections = []
+        for query, result in results.items():
+            note = None
+            if not isinstance(result, Exception) and self.ledger is not None:
+                result, note = self.ledger.apply(self.agent_name, query, self.search, result, run_id)
+            if result is None:
+                body = note
+            elif isinstance(result, Exception):
+                body = f"Search failed: {result}"
+            elif compact:
+                body = self.compactor.compact(self.search, result, seen)
+            else:
+                body = self.search._parse_results(result)
+            if result is not None and note:
+                body = f"{body}\n{note}"
+            sections.append(f"Results for \"{query}\":\n{body}")
+        return "\n\n".join(sections)
@@ -0,0 +1,99 @@
+from inspect import signature
+from typing import Optional
+
+from langchain.tools import BaseTool, StructuredTool
+
+from .database_tools import (CompanyUpdateTool, CompetitorTrendTool, OutreachLogTool, acheck_known_company,
+                             aupdate_decision_makers, check_known_company, check_known_company_tool,
+                             update_decision_makers, update_decision_makers_tool)
+from .schemas import CompanyBatchInput, CompetitorTrendInput, DecisionMakersInput, KnownCompanyInput, OutreachLogInput
+
+
+def structured_tool(name, description, schema, persist, apersist=None):
+    """
+    Typed counterpart of a database tool for OpenAI tool calling. The model fills
+    validated arguments instead of a free-text Action Input; persist receives them
+    as a plain dict, so the ReAct tools' persistence logic is shared. apersist is
+    its async counterpart, used when the agent runs under asyncio.
+    """
+    async def coroutine(**data):
+        return await apersist(schema.model_validate(data).model_dump())
+
+    return StructuredTool.from_function(
+        func=lambda **data: persist(schema.model_validate(data).model_dump()),
+        coroutine=coroutine if apersist is not None else None,
+        name=name,
+        description=description,
+        args_schema=schema,
+    )
+
+
+class StructuredDatabaseTool(BaseTool):
+    """
+    Typed counterpart of a database tool class for OpenAI tool calling. Validated
+    arguments reach the wrapped instance's _run/_arun as a plain dict together with
+    the run manager, so its trend buffer and per-run idempotency apply as in ReAct mode.
+    With items_key the wrapped tool receives the list under that key instead (the
+    bulk form of a tool whose ReAct input is a dict or a list of dicts).
+    """
+    tool: BaseTool
+    items_key: Optional[str] = None
+
+    def _run(self, run_manager=None, **data):
+        return self._call(self.tool._run, data, run_manager)
+
+    async def _arun(self, run_manager=None, **data):
+        return await self._call(self.tool._arun, data, run_manager)
+
+    def _call(self, method, data, run_manager):
+        data = self.args_schema.model_validate(data).model_dump()
+        if self.items_key is not None:
+            data = data[self.items_key]
+        if "run_manager" in signature(method).parameters:
+            return method(data, run_manager=run_manager)
+        return method(data)
+
+
+# Database tool classes -> (arguments schema, description for tool calling, key of the item list or None)
+TOOL_SCHEMAS = {
+    CompanyUpdateTool: (CompanyBatchInput, "Updates or creates company records in the database, "
+                                           "one or several companies per call.", "companies"),
+    CompetitorTrendTool: (CompetitorTrendInput, "Logs competitor trends for analysis.", None),
+    OutreachLogTool: (OutreachLogInput, "Creates an Email from the generated template and links it to the outreach record.", None),
+}
+
+
+def structured_counterpart(tool):
+    """
+    The tool-calling variant of an agent's tool: database tool instances are wrapped
+    (keeping their configuration, e.g. CompetitorTrendTool's buffer), function tools
+    are replaced from STRUCTURED_TOOLS and other tools are returned unchanged.
+    """
+    if type(tool) in TOOL_SCHEMAS:
+        schema, description, items_key = TOOL_SCHEMAS[type(tool)]
+        return StructuredDatabaseTool(tool=tool, name=tool.name, description=description, args_schema=schema,
+                                      items_key=items_key)
+    return STRUCTURED_TOOLS.get(tool.name, tool)
+
+
+update_decision_makers_structured = structured_tool(
+    update_decision_makers_tool.name,
+    "Replaces the decision_makers list of a company.",
+    DecisionMakersInput,
+    update_decision_makers,
+    aupdate_decision_makers,
+)
+
+check_known_company_structured = structured_tool(
+    check_known_company_tool.name,
+    "Checks whether a company is already in the database before researching it.",
+    KnownCompanyInput,
+    check_known_company,
+    acheck_known_company,
+)
+
+STRUCTURED_TOOLS = {
+    tool.name: tool
+    for tool in [structured_counterpart(tool_class()) for tool_class in TOOL_SCHEMAS]
+    + [update_decision_makers_structured, check_known_company_structured]
+}
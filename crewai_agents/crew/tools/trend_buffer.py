@@ -0,0 +1,149 @@
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+
+def trend_rows(rows):
+    """Unsaved CompetitorTrend objects for {content_hash: fields}."""
+    CompetitorTrend = apps.get_model('crewai_agents', 'CompetitorTrend')
+    return [CompetitorTrend(content_hash=content_hash, **fields) for content_hash, fields in rows.items()]
+
+
+def save_trends(rows):
+    """
+    Insert CompetitorTrend rows ({content_hash: fields}) in one bulk_create, skipping
+    hashes that are already stored. Returns (written, duplicates).
+    """
+    if not rows:
+        return 0, 0
+    CompetitorTrend = apps.get_model('crewai_agents', 'CompetitorTrend')
+    existing = set(CompetitorTrend.objects.filter(content_hash__in=rows).values_list('content_hash', flat=True))
+    new = [trend for trend in trend_rows(rows) if trend.content_hash not in existing]
+    # ignore_conflicts covers a concurrent run storing the same trend in between
+    CompetitorTrend.objects.bulk_create(new, ignore_conflicts=True)
+    return len(new), len(existing)
+
+
+async def asave_trends(rows):
+    """save_trends on the async ORM."""
+    if not rows:
+        return 0, 0
+    CompetitorTrend = apps.get_model('crewai_agents', 'CompetitorTrend')
+    existing = {content_hash async for content_hash in
+                CompetitorTrend.objects.filter(content_hash__in=rows).values_list('content_hash', flat=True)}
+    new = [trend for trend in trend_rows(rows) if trend.content_hash not in existing]
+    await CompetitorTrend.objects.abulk_create(new, ignore_conflicts=True)
+    return len(new), len(existing)
+
+
+class TrendWriteBuffer:
+    """
+    Write-behind buffer for competitor trends, keyed by the agent run (the executor's
+    run id) that logged them. Trends repeated within a run are dropped when queued,
+    trends already stored are dropped when written; a run's buffer is written every
+    TREND_BUFFER_SIZE trends and when TrendFlushHandler sees the run end.
+    """
+
+    def __init__(self, max_runs=64):
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._runs = OrderedDict()
+        self.counters = defaultdict(int)
+
+    @property
+    def enabled(self):
+        return getattr(settings, "TREND_BUFFER_ENABLED", True)
+
+    def add(self, run_id, fields):
+        """Queue a trend; returns "queued", "duplicate" or, when written at once, "saved"."""
+        status, batches = self._queue(run_id, fields)
+        for rows in batches:
+            written, _ = self.write(rows)
+            if status == "write":
+                status = "saved" if written else "duplicate"
+        return status
+
+    async def aadd(self, run_id, fields):
+        """add() for async agent runs; full batches are written with the async ORM."""
+        status, batches = self._queue(run_id, fields)
+        for rows in batches:
+            written, _ = await self.awrite(rows)
+            if status == "write":
+                status = "saved" if written else "duplicate"
+        return status
+
+    def _queue(self, run_id, fields):
+        """(status, batches to write now); status "write" means fields is the only batch."""
+        from ...models.models import trend_content_hash
+        content_hash = trend_content_hash(fields.get("competitor_name"), fields.get("trend_description"))
+        if run_id is None or not self.enabled:
+            return "write", [{content_hash: fields}]
+
+        batches = []
+        with self._lock:
+            pending, seen = self._runs.setdefault(run_id, ({}, set()))
+            self._runs.move_to_end(run_id)
+            if content_hash in seen:
+                self.counters["duplicates_in_run"] += 1
+                return "duplicate", []
+            seen.add(content_hash)
+            pending[content_hash] = fields
+            self.counters["queued"] += 1
+            if len(pending) >= getattr(settings, "TREND_BUFFER_SIZE", 20):
+                batches.append(dict(pending))
+                pending.clear()
+            # Runs whose end was never seen are written out rather than kept forever
+            while len(self._runs) > self.max_runs:
+                batches.append(self._runs.popitem(last=False)[1][0])
+        return "queued", batches
+
+    def flush(self, run_id):
+        """Write and forget the trends buffered for run_id."""
+        with self._lock:
+            entry = self._runs.pop(run_id, None)
+        if entry is not None:
+            self.write(entry[0])
+
+    def write(self, rows):
+        if not rows:
+            return 0, 0
+        return self._record(*save_trends(rows))
+
+    async def awrite(self, rows):
+        if not rows:
+            return 0, 0
+        return self._record(*await asave_trends(rows))
+
+    def _record(self, written, duplicates):
+        with self._lock:
+            self.counters["writes"] += 1
+            self.counters["written"] += written
+            self.counters["duplicates_stored"] += duplicates
+        logger.debug("Wrote %d competitor trends (%d already stored)", written, duplicates)
+        return written, duplicates
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+class TrendFlushHandler(BaseCallbackHandler):
+    """Executor callback that writes a run's buffered trends when the run ends or fails."""
+
+    # Async runs await the flush in a worker thread, so the sync ORM never runs on the event loop
+    run_inline = False
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self.buffer.flush(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.buffer.flush(run_id)
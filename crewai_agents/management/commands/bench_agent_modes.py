@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from langchain_community.callbacks import get_openai_callback
+
+from crewai_agents.crew.configs import AGENT_NAMES, DEFAULT_AGENT_INPUTS, get_agent, reset_agents
+from crewai_agents.models import Company, CompetitorTrend, Email
+from crewai_agents.models.models import NO_DECISION_MAKERS
+
+# Persisted records each agent is responsible for, measured before and after a run
+RECORD_COUNTERS = {
+    "market_researcher": lambda: CompetitorTrend.objects.count(),
+    "business_researcher": lambda: Company.objects.count(),
+    "decision_maker": lambda: -Company.objects.filter(NO_DECISION_MAKERS).count(),
+    "outreach_specialist": lambda: Email.objects.count(),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ReAct and tool-calling agent modes: LLM calls and tokens per persisted record. "
+        "Runs the real agents (OpenAI/Serper usage applies); writes are rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agents', nargs='+', choices=AGENT_NAMES, default=list(AGENT_NAMES))
+        parser.add_argument('--modes', nargs='+', choices=['react', 'tools'], default=['react', 'tools'])
+        parser.add_argument('--keep', action='store_true', help="Keep the records written by the runs")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'agent':<22}{'mode':<8}{'records':>8}{'LLM calls':>11}{'tokens':>10}"
+                          f"{'calls/rec':>11}{'tokens/rec':>12}")
+        for agent_name in options['agents']:
+            for mode in options['modes']:
+                stats = self._run(agent_name, mode, options['keep'])
+                records = stats['records']
+                self.stdout.write(
+                    f"{agent_name:<22}{mode:<8}{records:>8}{stats['calls']:>11}{stats['tokens']:>10}"
+                    f"{self._per(stats['calls'], records):>11}{self._per(stats['tokens'], records):>12}"
+                )
+
+    def _run(self, agent_name, mode, keep):
+        # The caches and the query ledger would hide LLM and search calls, sharded runs
+        # would write outside the rollback transaction, and batch outreach skips the agent
+        # loop being compared, so all are off for the measurement
+        with override_settings(AGENT_MODE=mode, LLM_CACHE_ENABLED=False, SEARCH_CACHE_ENABLED=False,
+                               SEARCH_LEDGER_ENABLED=False, DECISION_MAKER_MODE='agent', OUTREACH_MODE='agent'):
+            reset_agents(agent_name)
+            agent = get_agent(agent_name)
+            with transaction.atomic():
+                before = RECORD_COUNTERS[agent_name]()
+                with get_openai_callback() as cb:
+                    try:
+                        agent.run(DEFAULT_AGENT_INPUTS[agent_name])
+                    except Exception as e:
+                        self.stderr.write(f"{agent_name} ({mode}) failed: {e}")
+                records = RECORD_COUNTERS[agent_name]() - before
+                if not keep:
+                    transaction.set_rollback(True)
+            reset_agents(agent_name)
+        return {"records": records, "calls": cb.successful_requests, "tokens": cb.total_tokens}
+
+    @staticmethod
+    def _per(value, records):
+        return f"{value / records:.1f}" if records else "-"
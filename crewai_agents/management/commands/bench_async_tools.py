@@ -0,0 +1,79 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from crewai_agents.crew.tools import (check_known_company_tool, fetch_companies_tool, fetch_outreach_data_tool,
+                                      fetching_pending_outreach_ids)
+from crewai_agents.models import Company, Outreach
+
+# Read-only tools, so the benchmark can run against a development database as often as needed
+TOOLS = {
+    "fetch_outreach_data": fetch_outreach_data_tool,
+    "check_known_company": check_known_company_tool,
+    "fetch_companies": fetch_companies_tool,
+    "fetch_pending": fetching_pending_outreach_ids,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the database tools' sync path (one call after another, and a thread pool) against "
+        "their async path (concurrent calls gathered on one event loop), as many agents would call them. "
+        "Only read-only tools are called."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help="Calls per tool and mode")
+        parser.add_argument('--concurrency', type=int, default=20, help="Thread pool size / concurrent coroutines")
+        parser.add_argument('--tools', nargs='+', choices=list(TOOLS), default=list(TOOLS))
+
+    def handle(self, *args, **options):
+        inputs = self._inputs(options['calls'])
+        concurrency = options['concurrency']
+        self.stdout.write(f"{'tool':<22}{'sequential s':>14}{'threads s':>12}{'async s':>10}{'async calls/s':>15}")
+        for name in options['tools']:
+            tool, tool_inputs = TOOLS[name], inputs[name]
+            sequential = self._timed(lambda: [tool.run(data) for data in tool_inputs])
+            threaded = self._timed(lambda: self._threaded(tool, tool_inputs, concurrency))
+            concurrent = self._timed(lambda: asyncio.run(self._gathered(tool, tool_inputs, concurrency)))
+            self.stdout.write(f"{name:<22}{sequential:>14.3f}{threaded:>12.3f}{concurrent:>10.3f}"
+                              f"{len(tool_inputs) / concurrent if concurrent else 0:>15.1f}")
+
+    def _inputs(self, calls):
+        outreach_ids = list(Outreach.objects.order_by('outreach_id').values_list('outreach_id', flat=True)[:calls])
+        names = list(Company.objects.order_by('id').values_list('company_name', flat=True)[:calls])
+        if not outreach_ids or not names:
+            raise CommandError("The benchmark needs companies and outreach records in the database.")
+        return {
+            "fetch_outreach_data": [str(outreach_ids[i % len(outreach_ids)]) for i in range(calls)],
+            "check_known_company": [names[i % len(names)] for i in range(calls)],
+            "fetch_companies": [""] * calls,
+            "fetch_pending": [""] * calls,
+        }
+
+    def _timed(self, run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+
+    def _threaded(self, tool, inputs, concurrency):
+        def call(data):
+            try:
+                return tool.run(data)
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(call, inputs))
+
+    async def _gathered(self, tool, inputs, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(data):
+            async with semaphore:
+                return await tool.arun(data)
+
+        await asyncio.gather(*(call(data) for data in inputs))
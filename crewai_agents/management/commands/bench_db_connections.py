@@ -0,0 +1,61 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from crewai_agents.crew.tools import check_known_company_tool
+from crewai_agents.models import Company
+from restoring_minds.db import metrics, pooled, release_connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the connection overhead of a database tool call (check_known_company). "
+        "'fresh' closes the connection after every call, as CONN_MAX_AGE=0 does per task; "
+        "'persistent' keeps it open across calls with health checks (DB_CONN_MAX_AGE); "
+        "'pool' returns it to psycopg's pool after every call (DB_POOL=true)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200)
+
+    def handle(self, *args, **options):
+        name = Company.objects.values_list('company_name', flat=True).first()
+        if name is None:
+            raise CommandError("The benchmark needs at least one company in the database.")
+
+        modes = ("pool",) if pooled() else ("fresh", "persistent")
+        self.stdout.write(f"{'mode':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'connections':>13}")
+        results = {}
+        for mode in modes:
+            timings, opened = self._run(mode, name, options['calls'])
+            results[mode] = statistics.mean(timings)
+            self.stdout.write(f"{mode:<12}{results[mode]:>10.3f}{statistics.median(timings):>10.3f}"
+                              f"{statistics.quantiles(timings, n=20)[-1]:>10.3f}{opened:>13}")
+        if "persistent" in results:
+            self.stdout.write(f"Saved per call by persistent connections: {results['fresh'] - results['persistent']:.3f} ms")
+        pool_stats = metrics.stats().get(connection.alias, {}).get("pool")
+        if pool_stats:
+            self.stdout.write(f"Pool: {pool_stats}")
+
+    def _run(self, mode, name, calls):
+        settings_dict = connection.settings_dict
+        saved = settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"]
+        if mode == "persistent":
+            settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = max(saved[0] or 0, 60), True
+        connection.close()
+        before = metrics.stats().get(connection.alias, {}).get("opened", 0)
+        timings = []
+        try:
+            for _ in range(calls):
+                start = time.perf_counter()
+                release_connections()
+                check_known_company_tool.run(name)
+                if mode != "persistent":
+                    connection.close()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = saved
+        return timings, metrics.stats().get(connection.alias, {}).get("opened", 0) - before
@@ -0,0 +1,114 @@
+import ast
+import glob
+import json
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from crewai_agents.crew.tools.parsing import ToolInputError, loads
+
+# Action Inputs as the ReAct agents write them, including the malformations seen in their transcripts
+CORPUS = {
+    "company json": '{"company_name": "Texas Health Resources", "size": 26000, "industry": "Healthcare", '
+                    '"location": "Arlington, TX", "stress_score": 8.5, "website_url": "https://www.texashealth.org"}',
+    "company list": json.dumps([
+        {"company_name": f"Company {i}", "size": 120 + i, "industry": "Logistics", "location": "Irving, TX",
+         "stress_score": 7.0, "website_url": f"https://company{i}.com"} for i in range(10)
+    ]),
+    "python dict": "{'competitor_name': 'Calm Corporate', 'trend_description': 'Bundling meditation apps into "
+                   "EAP plans for mid-size employers', 'impact_level': 'High'}",
+    "apostrophe": "{'company_name': \"Children's Health\", 'size': 7000, 'industry': 'Healthcare', "
+                  "'location': 'Dallas, TX', 'stress_score': None}",
+    "quoted json": "'{\"competitor_name\": \"Headspace\", \"trend_description\": \"On-site workshops\", "
+                   "\"impact_level\": \"Medium\"}'",
+    "code fence": '```json\n{"company_id": 12, "decision_makers": [{"name": "Jane Doe", "title": "CHRO", '
+                  '"email": "jane.doe@example.com", "linkedin_profile": "N/A"}]}\n```',
+    "trailing comma": '{"company_id": 4, "decision_makers": [{"name": "John Roe", "role": "CEO",},],}',
+    "prose around": 'Action Input: {"outreach_id": 17}\nObservation: pending',
+    "escaped quotes": '{\\"outreach_id\\": 3, \\"email_template_data\\": {\\"name\\": \\"Intro\\", '
+                      '\\"subject\\": \\"Hello\\", \\"content\\": \\"Hi there\\"}}',
+    "bare id": "42",
+}
+
+ACTION_INPUT = re.compile(r"Action Input:\s*(.*)", re.DOTALL)
+
+
+def legacy_parse(text):
+    """The cascade the database tools used before the shared parser (without its debug prints)."""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    elif text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    text = text.strip()
+    if text.startswith("'") and text.endswith("'"):
+        text = text[1:-1]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            return ast.literal_eval(text)
+        except Exception:
+            return json.loads(text.replace("'", '"'))
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the shared tool input parser against the previous json/ast cascade over a "
+        "corpus of agent Action Inputs. Recorded cassettes can be added to the corpus with --cassette-dir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--cassette-dir', help="Also parse the Action Inputs found in these recorded runs")
+
+    def handle(self, *args, **options):
+        corpus = dict(CORPUS)
+        if options['cassette_dir']:
+            corpus.update(self._cassette_inputs(options['cassette_dir']))
+
+        iterations = options['iterations']
+        self.stdout.write(f"{'input':<22}{'chars':>7}{'legacy us':>11}{'shared us':>11}{'legacy':>8}{'shared':>8}")
+        totals = {"legacy": 0.0, "shared": 0.0}
+        for name, text in corpus.items():
+            row = {}
+            for label, parse in (("legacy", legacy_parse), ("shared", loads)):
+                ok = self._ok(parse, text)
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    try:
+                        parse(text)
+                    except (ValueError, SyntaxError, ToolInputError):
+                        pass
+                elapsed = (time.perf_counter() - start) / iterations * 1e6
+                totals[label] += elapsed
+                row[label] = (elapsed, "ok" if ok else "fail")
+            self.stdout.write(
+                f"{name[:21]:<22}{len(text):>7}{row['legacy'][0]:>11.1f}{row['shared'][0]:>11.1f}"
+                f"{row['legacy'][1]:>8}{row['shared'][1]:>8}"
+            )
+        self.stdout.write(f"{'total':<29}{totals['legacy']:>11.1f}{totals['shared']:>11.1f}")
+
+    def _ok(self, parse, text):
+        try:
+            return isinstance(parse(text), (dict, list, int))
+        except (ValueError, SyntaxError, ToolInputError):
+            return False
+
+    def _cassette_inputs(self, directory):
+        inputs = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            with open(path) as f:
+                interactions = json.load(f)
+            for responses in interactions.values():
+                for response in responses:
+                    content = response.get("message", {}).get("data", {}).get("content") or ""
+                    match = ACTION_INPUT.search(content)
+                    if match:
+                        name = f"{os.path.basename(path)[:-5]} #{len(inputs) + 1}"
+                        inputs[name] = match.group(1).strip()
+        return inputs
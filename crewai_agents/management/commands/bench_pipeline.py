@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from crewai_agents.crew.configs import AGENT_NAMES, DEFAULT_AGENT_INPUTS, build_agent_pipeline, reset_agents
+from crewai_agents.models import Company, CompetitorTrend, Email
+from crewai_agents.models.models import NO_DECISION_MAKERS
+
+RECORD_COUNTERS = {
+    "companies": lambda: Company.objects.count(),
+    "competitor_trends": lambda: CompetitorTrend.objects.count(),
+    "companies_with_decision_makers": lambda: Company.objects.exclude(NO_DECISION_MAKERS).count(),
+    "emails": lambda: Email.objects.count(),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the agent pipeline end-to-end against recorded OpenAI/Serper cassettes and report "
+        "records per second and time per stage. Records are written to the configured database, "
+        "so point it at a development database. Use --mode record once (with real keys) to capture cassettes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['replay', 'record'], default='replay')
+        parser.add_argument('--cassette-dir', help="Defaults to CREW_CASSETTE_DIR")
+        parser.add_argument('--llm-latency', type=float, default=0.0, help="Injected seconds per replayed LLM call")
+        parser.add_argument('--search-latency', type=float, default=0.0, help="Injected seconds per replayed search")
+        parser.add_argument('--agents', nargs='+', choices=AGENT_NAMES, default=list(AGENT_NAMES))
+
+    def handle(self, *args, **options):
+        overrides = {
+            "CREW_CASSETTE_MODE": options['mode'],
+            "CREW_REPLAY_LLM_LATENCY": options['llm_latency'],
+            "CREW_REPLAY_SEARCH_LATENCY": options['search_latency'],
+            # Cached completions and search results would bypass the cassette
+            "LLM_CACHE_ENABLED": False,
+            "SEARCH_CACHE_ENABLED": False,
+            # Replaying the same cassette twice would otherwise only return "no new results"
+            "SEARCH_LEDGER_ENABLED": False,
+        }
+        if options['cassette_dir']:
+            overrides["CREW_CASSETTE_DIR"] = options['cassette_dir']
+
+        with override_settings(**overrides):
+            reset_agents()
+            try:
+                before = {name: counter() for name, counter in RECORD_COUNTERS.items()}
+                pipeline = build_agent_pipeline({name: DEFAULT_AGENT_INPUTS[name] for name in options['agents']})
+                start = time.perf_counter()
+                results = pipeline.run()
+                elapsed = time.perf_counter() - start
+                # Agents are built by now, so this does not import the agents module early
+                from crewai_agents.crew.configs.agents import rate_limiter
+                rate_limit_waits = rate_limiter.stats()
+                written = {name: counter() - before[name] for name, counter in RECORD_COUNTERS.items()}
+            finally:
+                reset_agents()
+
+        self.stdout.write("Stage timings:")
+        for name, result in results.items():
+            duration = f"{result.duration:.3f}s" if result.duration is not None else "-"
+            error = f" ({result.error})" if result.error else ""
+            self.stdout.write(f"  {name:<22}{result.status:<11}{duration}{error}")
+
+        total = sum(written.values())
+        self.stdout.write("Records written:")
+        for name, count in written.items():
+            self.stdout.write(f"  {name:<32}{count}")
+        for name, metric in rate_limit_waits.items():
+            self.stdout.write(f"Rate limit {name}: {metric['throttled']}/{metric['calls']} calls waited "
+                              f"{metric['wait_seconds']:.3f}s (max {metric['max_wait_seconds']:.3f}s)")
+        self.stdout.write(f"Total: {total} records in {elapsed:.3f}s ({total / elapsed if elapsed else 0:.1f} records/s)")
@@ -0,0 +1,58 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+SCENARIOS = {
+    "import crew configs (lazy registry)": "import crewai_agents.crew.configs",
+    "import + build one agent": (
+        "import crewai_agents.crew.configs as configs\n"
+        "configs.get_agent('market_researcher')"
+    ),
+    "import + build all agents (eager, previous behaviour)": (
+        "import crewai_agents.crew.configs as configs\n"
+        "for name in configs.AGENT_NAMES:\n"
+        "    configs.get_agent(name)"
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark cold-start time of importing the crew configs versus building agents."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per scenario")
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        # Dummy keys: building agents needs them, but nothing here talks to the APIs
+        env.setdefault('OPENAI_API_KEY', 'sk-benchmark')
+        env.setdefault('SERPER_API_KEY', 'benchmark')
+
+        for label, code in SCENARIOS.items():
+            timings = [self._measure(code, env) for _ in range(options['runs'])]
+            self.stdout.write(
+                f"{label:<55} median {statistics.median(timings) * 1000:8.1f} ms   "
+                f"min {min(timings) * 1000:8.1f} ms"
+            )
+
+    def _measure(self, code, env):
+        result = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(code=code)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return float(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0031_scriptstatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(blank=True, max_length=100)),
+                ('temperature', models.FloatField(blank=True, null=True)),
+                ('prompt_hash', models.CharField(max_length=64)),
+                ('response', models.JSONField(default=list, help_text='Serialized LangChain generations')),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'LLM Cache Entry',
+                'verbose_name_plural': 'LLM Cache Entries',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0032_llmcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailFragment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('industry', models.CharField(max_length=255)),
+                ('size_band', models.CharField(help_text='Pricing tier range (or fallback band) the fragment was written for', max_length=50)),
+                ('prompt_hash', models.CharField(help_text='Hash of the prompt that generated the fragment', max_length=64)),
+                ('pain_points', models.TextField()),
+                ('value_proposition', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('industry', 'size_band', 'prompt_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0033_emailfragment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentconfig',
+            name='writer_model_name',
+            field=models.CharField(blank=True, default='', help_text='Model for long-form writing (defaults to model_name)', max_length=50),
+        ),
+    ]
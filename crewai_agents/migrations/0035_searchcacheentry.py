@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0034_agentconfig_writer_model_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('query', models.CharField(help_text='Normalized search query', max_length=500)),
+                ('search_type', models.CharField(default='search', max_length=20)),
+                ('results', models.JSONField(default=dict, help_text='Raw Serper response')),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Search Cache Entry',
+                'verbose_name_plural': 'Search Cache Entries',
+            },
+        ),
+    ]
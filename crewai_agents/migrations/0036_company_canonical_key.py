@@ -0,0 +1,73 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:57
+
+import re
+import unicodedata
+from urllib.parse import urlparse
+
+from django.db import migrations, models
+
+# Copies of the model helpers as of this migration, so later changes to them do not alter it
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "pllc", "pc", "pa",
+}
+
+
+def canonical_company_name(name):
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    words = re.sub(r"[^a-z0-9]+", " ", name.replace("&", " and ")).split()
+    if words[:1] == ["the"]:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def website_domain(url):
+    url = (url or "").strip().lower()
+    if not url:
+        return ""
+    host = urlparse(url if "://" in url else f"http://{url}").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def backfill_company_keys(apps, schema_editor):
+    """Compute the keys for existing companies; later duplicates of a name get a "#<id>" suffix."""
+    Company = apps.get_model('crewai_agents', 'Company')
+    seen = set()
+    companies = list(Company.objects.order_by('id').only('id', 'company_name', 'website_url'))
+    for company in companies:
+        key = canonical_company_name(company.company_name) or None
+        if key is not None and key in seen:
+            key = f"{key}#{company.id}"
+        elif key is not None:
+            seen.add(key)
+        company.canonical_key = key
+        company.website_domain = website_domain(company.website_url)
+    Company.objects.bulk_update(companies, ['canonical_key', 'website_domain'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0035_searchcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='canonical_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='website_domain',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_company_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='company',
+            name='canonical_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0036_company_canonical_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('agent_name', models.CharField(max_length=50)),
+                ('query_key', models.CharField(max_length=64)),
+                ('query', models.CharField(help_text='Normalized search query', max_length=500)),
+                ('result_keys', models.JSONField(default=list, help_text='Identities (URL or snippet hash) of the results seen')),
+                ('run_id', models.CharField(blank=True, help_text='Agent run that last issued the query', max_length=36)),
+                ('run_count', models.PositiveIntegerField(default=1)),
+                ('first_seen_at', models.DateTimeField(auto_now_add=True)),
+                ('last_run_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Search Query Ledger Entry',
+                'verbose_name_plural': 'Search Query Ledger',
+                'unique_together': {('agent_name', 'query_key')},
+            },
+        ),
+    ]
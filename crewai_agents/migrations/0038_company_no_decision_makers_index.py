@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0037_searchqueryledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(condition=models.Q(('decision_makers', []), ('decision_makers', None), _connector='OR'), fields=['id'], name='company_no_dm_id_idx'),
+        ),
+    ]
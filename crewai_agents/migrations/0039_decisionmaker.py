@@ -0,0 +1,77 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copies of the model helpers as of this migration, so later changes to them do not alter it
+NO_DECISION_MAKERS = models.Q(decision_makers=[]) | models.Q(decision_makers=None)
+CONTACT_PLACEHOLDERS = {"", "n/a", "na", "none", "null", "unknown", "not found", "email@example.com"}
+
+
+def contact_value(value, max_length=255):
+    value = str(value).strip() if value is not None else ""
+    return "" if value.lower() in CONTACT_PLACEHOLDERS else value[:max_length]
+
+
+def decision_maker_rows(contacts):
+    rows = []
+    for position, contact in enumerate(contacts if isinstance(contacts, list) else []):
+        if not isinstance(contact, dict):
+            continue
+        rows.append({
+            "position": position,
+            "name": contact_value(contact.get("name")),
+            "role": contact_value(contact.get("role") or contact.get("title")),
+            "email": contact_value(contact.get("email"), 254).lower(),
+            "phone": contact_value(contact.get("phone"), 50),
+            "linkedin_profile": contact_value(contact.get("linkedin_profile"), 500),
+            "preferred_contact": contact_value(contact.get("preferred_contact"), 20),
+            "last_contact_date": contact_value(contact.get("last_contact_date"), 20),
+            "notes": contact_value(contact.get("notes"), 10000),
+        })
+    return rows
+
+
+def backfill_decision_makers(apps, schema_editor):
+    """Create DecisionMaker rows from the decision_makers JSON of existing companies."""
+    Company = apps.get_model('crewai_agents', 'Company')
+    DecisionMaker = apps.get_model('crewai_agents', 'DecisionMaker')
+    companies = Company.objects.exclude(NO_DECISION_MAKERS).only('id', 'decision_makers').order_by('id')
+    batch = []
+    for company in companies.iterator(chunk_size=500):
+        batch += [DecisionMaker(company_id=company.id, **row) for row in decision_maker_rows(company.decision_makers)]
+        if len(batch) >= 1000:
+            DecisionMaker.objects.bulk_create(batch)
+            batch = []
+    DecisionMaker.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0038_company_no_decision_makers_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DecisionMaker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('role', models.CharField(blank=True, max_length=255)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=50)),
+                ('linkedin_profile', models.CharField(blank=True, max_length=500)),
+                ('preferred_contact', models.CharField(blank=True, max_length=20)),
+                ('last_contact_date', models.CharField(blank=True, max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contacts', to='crewai_agents.company')),
+            ],
+            options={
+                'ordering': ['company', 'position'],
+                'indexes': [models.Index(fields=['email'], name='decision_maker_email_idx'), models.Index(fields=['role'], name='decision_maker_role_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_decision_makers, migrations.RunPython.noop),
+    ]
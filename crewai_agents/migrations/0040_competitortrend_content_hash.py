@@ -0,0 +1,66 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:07
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Copies of the model helpers as of this migration, so later changes to them do not alter it
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "pllc", "pc", "pa",
+}
+
+
+def canonical_company_name(name):
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    words = re.sub(r"[^a-z0-9]+", " ", name.replace("&", " and ")).split()
+    if words[:1] == ["the"]:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def trend_content_hash(competitor_name, trend_description):
+    description = unicodedata.normalize("NFKD", trend_description or "").encode("ascii", "ignore").decode("ascii")
+    description = " ".join(re.sub(r"[^a-z0-9]+", " ", description.lower()).split())
+    return hashlib.sha256(f"{canonical_company_name(competitor_name)}\n{description}".encode("utf-8")).hexdigest()
+
+
+def backfill_trend_hashes(apps, schema_editor):
+    """Hash existing trends; later duplicates of a trend are deleted, the first one is kept."""
+    CompetitorTrend = apps.get_model('crewai_agents', 'CompetitorTrend')
+    kept, duplicates = {}, []
+    trends = list(CompetitorTrend.objects.order_by('trend_id').only('trend_id', 'competitor_name', 'trend_description'))
+    for trend in trends:
+        content_hash = trend_content_hash(trend.competitor_name, trend.trend_description)
+        if content_hash in kept:
+            duplicates.append(trend.trend_id)
+        else:
+            trend.content_hash = content_hash
+            kept[content_hash] = trend
+    CompetitorTrend.objects.bulk_update(list(kept.values()), ['content_hash'], batch_size=500)
+    CompetitorTrend.objects.filter(trend_id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0039_decisionmaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competitortrend',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_trend_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='competitortrend',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:09
+
+import hashlib
+
+from django.db import migrations, models
+
+
+# Copy of the model helper as of this migration, so later changes to it do not alter it
+def email_content_hash(subject, recipient, content):
+    parts = ((subject or "").strip(), (recipient or "").strip().lower(), (content or "").replace("\r\n", "\n").strip())
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def backfill_email_hashes(apps, schema_editor):
+    """
+    Hash existing emails. A later duplicate is merged into the first copy: its
+    outreach records are repointed to that copy, which also becomes a default
+    template if the duplicate was one, and the duplicate is deleted.
+    """
+    Email = apps.get_model('crewai_agents', 'Email')
+    Outreach = apps.get_model('crewai_agents', 'Outreach')
+    kept, merged, defaults = {}, {}, set()
+    emails = list(Email.objects.order_by('id').only('id', 'subject', 'recipient', 'content', 'is_default'))
+    for email in emails:
+        content_hash = email_content_hash(email.subject, email.recipient, email.content)
+        if content_hash in kept:
+            merged.setdefault(kept[content_hash].id, []).append(email.id)
+            if email.is_default:
+                defaults.add(kept[content_hash].id)
+        else:
+            email.content_hash = content_hash
+            kept[content_hash] = email
+    Email.objects.bulk_update(list(kept.values()), ['content_hash'], batch_size=500)
+    for email_id, duplicate_ids in merged.items():
+        Outreach.objects.filter(email_id__in=duplicate_ids).update(email_id=email_id)
+    Email.objects.filter(id__in=defaults).update(is_default=True)
+    Email.objects.filter(id__in=[email_id for duplicate_ids in merged.values() for email_id in duplicate_ids]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0040_competitortrend_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='email',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_email_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='email',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='outreach',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crewai_agents', '0041_email_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='agentconfig',
+            name='model_name',
+            field=models.CharField(default='gpt-4o-mini', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='agentconfig',
+            name='temperature',
+            field=models.FloatField(default=0.7),
+        ),
+    ]
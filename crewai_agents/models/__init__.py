@@ -1 +1 @@
-from .models import  SiteUser,  Company, Outreach, CompetitorTrend, PricingTier, Email, AgentConfig, ToolConfig, AgentLog, ToolLog, AgentTask, ScriptStatus
\ No newline at end of file
+from .models import  SiteUser,  Company, DecisionMaker, Outreach, CompetitorTrend, PricingTier, Email, EmailFragment, AgentConfig, ToolConfig, AgentLog, ToolLog, AgentTask, ScriptStatus, LLMCacheEntry, SearchCacheEntry, SearchQueryLedger
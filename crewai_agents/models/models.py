@@ -5,6 +5,10 @@ from django.utils.html import format_html
 import uuid
 from django.utils import timezone
 import datetime
+import hashlib
+import re
+import unicodedata
+from urllib.parse import urlparse
 
 
 """Admin User Manager"""
@@ -67,12 +71,46 @@ class SiteUser(AbstractBaseUser, PermissionsMixin):
     
 
 """Company Model"""
+# Legal-form words that do not distinguish one company from another
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "pllc", "pc", "pa",
+}
+
+
+def canonical_company_name(name):
+    """Lowercased name without accents, punctuation, a leading "the" or legal suffixes."""
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    words = re.sub(r"[^a-z0-9]+", " ", name.replace("&", " and ")).split()
+    if words[:1] == ["the"]:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+# Companies still waiting for decision makers; shared by the partial index and the queries it serves
+NO_DECISION_MAKERS = models.Q(decision_makers=[]) | models.Q(decision_makers=None)
+
+
+def website_domain(url):
+    """Host of a website URL without "www." (scheme optional), or an empty string."""
+    url = (url or "").strip().lower()
+    if not url:
+        return ""
+    host = urlparse(url if "://" in url else f"http://{url}").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
 class Company(models.Model):
     company_name = models.CharField(max_length=255)
+    # Normalized company_name; unique so a company is stored once whatever spelling the agent used
+    canonical_key = models.CharField(max_length=255, unique=True, null=True, blank=True, editable=False)
     employee_size = models.IntegerField()
     industry = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
     website_url = models.URLField()
+    website_domain = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
     revenue_growth = models.FloatField(blank=True, null=True)
     stress_level_score = models.IntegerField(blank=True, null=True)
     wellness_culture_score = models.IntegerField(blank=True, null=True)
@@ -101,6 +139,55 @@ class Company(models.Model):
 
     def __str__(self):
         return self.company_name
+
+    def clean(self):
+        """Reject a name that normalizes to the key of another stored company."""
+        key = self.saved_key()
+        other = key and Company.objects.filter(canonical_key=key).exclude(pk=self.pk).values_list('company_name', 'id').first()
+        if other:
+            raise ValidationError({"company_name": f"This company is already stored as {other[0]} (ID {other[1]})."})
+
+    def saved_key(self):
+        """The canonical_key save() stores for the current company_name."""
+        key = self.key_for(self.company_name)
+        # Rows de-duplicated by the backfill keep their "#<id>" suffix while the name is unchanged
+        if (self.canonical_key or "").split("#", 1)[0] == (key or ""):
+            return self.canonical_key
+        return key
+
+    def save(self, *args, **kwargs):
+        self.canonical_key = self.saved_key()
+        self.website_domain = website_domain(self.website_url)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"company_name", "website_url"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "canonical_key", "website_domain"}
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def key_for(company_name):
+        """canonical_key for a company name (None when nothing is left after normalizing)."""
+        return canonical_company_name(company_name) or None
+
+    @classmethod
+    def known_lookup(cls, company_name=None, website_url=None):
+        """Q matching the name's canonical key or the website's domain."""
+        lookup = models.Q(pk__in=[])
+        key = cls.key_for(company_name)
+        domain = website_domain(website_url)
+        if key:
+            lookup |= models.Q(canonical_key=key)
+        if domain:
+            lookup |= models.Q(website_domain=domain)
+        return lookup
+
+    @classmethod
+    def find_known(cls, company_name=None, website_url=None):
+        """The stored company matching the name's canonical key or the website's domain (one query)."""
+        return cls.objects.filter(cls.known_lookup(company_name, website_url)).first()
+
+    @classmethod
+    async def afind_known(cls, company_name=None, website_url=None):
+        return await cls.objects.filter(cls.known_lookup(company_name, website_url)).afirst()
     
     def get_pricing_tier(self):
         """
@@ -116,9 +203,97 @@ class Company(models.Model):
     class Meta:
         verbose_name = 'Company'
         verbose_name_plural = 'Companies'
+        indexes = [
+            # Keyset pages of the decision-maker backlog are range scans on this index
+            models.Index(fields=['id'], condition=NO_DECISION_MAKERS, name='company_no_dm_id_idx'),
+        ]
+
+
+"""DecisionMaker Model"""
+# Values agents write when a contact field was not found
+CONTACT_PLACEHOLDERS = {"", "n/a", "na", "none", "null", "unknown", "not found", "email@example.com"}
+
+
+def contact_value(value, max_length=255):
+    """A contact field as text, empty for placeholders."""
+    value = str(value).strip() if value is not None else ""
+    return "" if value.lower() in CONTACT_PLACEHOLDERS else value[:max_length]
+
+
+def decision_maker_rows(contacts):
+    """DecisionMaker field values for each dict in a Company.decision_makers list."""
+    rows = []
+    for position, contact in enumerate(contacts if isinstance(contacts, list) else []):
+        if not isinstance(contact, dict):
+            continue
+        rows.append({
+            "position": position,
+            "name": contact_value(contact.get("name")),
+            "role": contact_value(contact.get("role") or contact.get("title")),
+            "email": contact_value(contact.get("email"), 254).lower(),
+            "phone": contact_value(contact.get("phone"), 50),
+            "linkedin_profile": contact_value(contact.get("linkedin_profile"), 500),
+            "preferred_contact": contact_value(contact.get("preferred_contact"), 20),
+            "last_contact_date": contact_value(contact.get("last_contact_date"), 20),
+            "notes": contact_value(contact.get("notes"), 10000),
+        })
+    return rows
+
+
+class DecisionMaker(models.Model):
+    """
+    One contact from Company.decision_makers, stored as a row so contacts can be
+    looked up by email or role and companies filtered on having contacts without
+    decoding the JSON. The JSON list stays the source the agents read and write;
+    these rows are rebuilt from it whenever a company is saved.
+    """
+
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='contacts')
+    # Index of the contact in the company's decision_makers list
+    position = models.PositiveSmallIntegerField(default=0)
+    name = models.CharField(max_length=255, blank=True)
+    role = models.CharField(max_length=255, blank=True)
+    # Lowercased; empty when the agent found no address
+    email = models.CharField(max_length=254, blank=True)
+    phone = models.CharField(max_length=50, blank=True)
+    linkedin_profile = models.CharField(max_length=500, blank=True)
+    preferred_contact = models.CharField(max_length=20, blank=True)
+    last_contact_date = models.CharField(max_length=20, blank=True)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['company', 'position']
+        indexes = [
+            models.Index(fields=['email'], name='decision_maker_email_idx'),
+            models.Index(fields=['role'], name='decision_maker_role_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.role}) - {self.company}"
+
+    @classmethod
+    def sync(cls, company):
+        """Replace the company's rows with its current decision_makers list."""
+        cls.objects.filter(company=company).delete()
+        cls.objects.bulk_create([cls(company=company, **row) for row in decision_maker_rows(company.decision_makers)])
+
+    @classmethod
+    def find_by_email(cls, email):
+        """Contacts with this email address (indexed lookup, case-insensitive)."""
+        email = contact_value(email, 254).lower()
+        if not email:
+            return cls.objects.none()
+        return cls.objects.filter(email=email).select_related('company')
 
 
 """CompetitorTrend Model"""
+def trend_content_hash(competitor_name, trend_description):
+    """Hash of the canonical competitor name and the description without case, accents or punctuation."""
+    description = unicodedata.normalize("NFKD", trend_description or "").encode("ascii", "ignore").decode("ascii")
+    description = " ".join(re.sub(r"[^a-z0-9]+", " ", description.lower()).split())
+    return hashlib.sha256(f"{canonical_company_name(competitor_name)}\n{description}".encode("utf-8")).hexdigest()
+
+
 class CompetitorTrend(models.Model):
     IMPACT_LEVELS = [
         ('High', 'High'),
@@ -133,10 +308,26 @@ class CompetitorTrend(models.Model):
     competitor_name = models.CharField(max_length=100, blank=True, null=True)
     impact_level = models.CharField(max_length=50, choices=IMPACT_LEVELS)
     notes = models.TextField(default="")
+    # trend_content_hash of competitor_name and trend_description; a trend is stored once
+    content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"Trend {self.trend_id} - {self.trend_description[:50]}"
 
+    def clean(self):
+        """Reject a trend whose normalized text is already stored (content_hash is unique)."""
+        content_hash = trend_content_hash(self.competitor_name, self.trend_description)
+        other = CompetitorTrend.objects.filter(content_hash=content_hash).exclude(pk=self.pk).values_list('trend_id', flat=True).first()
+        if other:
+            raise ValidationError(f"This trend is already stored as trend {other}.")
+
+    def save(self, *args, **kwargs):
+        self.content_hash = trend_content_hash(self.competitor_name, self.trend_description)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"competitor_name", "trend_description"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
 
 """PricingTier Model"""
 class PricingTier(models.Model):
@@ -177,6 +368,12 @@ class PricingTier(models.Model):
         ordering = ['min_employees']
 
 """EmailTemplate Model"""
+def email_content_hash(subject, recipient, content):
+    """Hash of an email's subject, recipient and body, ignoring surrounding whitespace and recipient case."""
+    parts = ((subject or "").strip(), (recipient or "").strip().lower(), (content or "").replace("\r\n", "\n").strip())
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
 class Email(models.Model):
     name = models.CharField(max_length=100)
     recipient = models.EmailField(null=True, blank=True)
@@ -186,6 +383,8 @@ class Email(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_default = models.BooleanField(default=True)
+    # email_content_hash of subject, recipient and content; identical emails are stored once
+    content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['-updated_at']
@@ -193,6 +392,39 @@ class Email(models.Model):
     def __str__(self):
         return f"{self.name} ({self.subject})"
 
+    def clean(self):
+        """Reject an email identical to a stored one (content_hash is unique)."""
+        content_hash = email_content_hash(self.subject, self.recipient, self.content)
+        other = Email.objects.filter(content_hash=content_hash).exclude(pk=self.pk).values_list('name', 'id').first()
+        if other:
+            raise ValidationError(f"An identical email is already stored as {other[0]} (ID {other[1]}).")
+
+    def save(self, *args, **kwargs):
+        self.content_hash = email_content_hash(self.subject, self.recipient, self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"subject", "recipient", "content"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
+
+"""EmailFragment Model"""
+class EmailFragment(models.Model):
+    """Reusable, LLM-generated email paragraphs shared by companies in the same industry and size band."""
+
+    industry = models.CharField(max_length=255)
+    size_band = models.CharField(max_length=50, help_text="Pricing tier range (or fallback band) the fragment was written for")
+    prompt_hash = models.CharField(max_length=64, help_text="Hash of the prompt that generated the fragment")
+    pain_points = models.TextField()
+    value_proposition = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.industry} ({self.size_band})"
+
+    class Meta:
+        unique_together = ('industry', 'size_band', 'prompt_hash')
+
 
 """Outreach Model"""
 class Outreach(models.Model):
@@ -208,6 +440,8 @@ class Outreach(models.Model):
     created_at = models.DateTimeField(default=datetime.date.today)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     comments = models.TextField(blank=True, null=True, default=None)
+    # Agent run (AgentTask or executor run) that last linked an email; a repeat from that run is a no-op
+    idempotency_key = models.CharField(max_length=64, blank=True, null=True, editable=False)
 
     def __str__(self):
         return f"Outreach {self.outreach_id} to {self.company}"
@@ -231,8 +465,11 @@ class AgentConfig(models.Model):
     name = models.CharField(max_length=100)
     agent_type = models.CharField(max_length=50, choices=AGENT_TYPES)
     description = models.TextField()
-    model_name = models.CharField(max_length=50, default='gpt-4')
-    temperature = models.FloatField(default=0.5)
+    # Same defaults as the agents use without an AgentConfig (crew.configs.agent_config)
+    model_name = models.CharField(max_length=50, default='gpt-4o-mini')
+    writer_model_name = models.CharField(max_length=50, blank=True, default='',
+                                         help_text="Model for long-form writing (defaults to model_name)")
+    temperature = models.FloatField(default=0.7)
     system_prompt = models.TextField()
     tools = models.JSONField(default=list, help_text="List of tool names this agent can use")
     is_active = models.BooleanField(default=True)
@@ -412,3 +649,67 @@ class ScriptStatus(models.Model):
     def is_running(self):
         """Check if the script is running"""
 
+
+"""LLMCacheEntry Model"""
+class LLMCacheEntry(models.Model):
+    """Model for persisting LLM completions between agent runs."""
+
+    key = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100, blank=True)
+    temperature = models.FloatField(blank=True, null=True)
+    prompt_hash = models.CharField(max_length=64)
+    response = models.JSONField(default=list, help_text="Serialized LangChain generations")
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model_name} ({self.temperature}) - {self.prompt_hash[:12]}"
+
+    class Meta:
+        verbose_name = "LLM Cache Entry"
+        verbose_name_plural = "LLM Cache Entries"
+
+
+"""SearchCacheEntry Model"""
+class SearchCacheEntry(models.Model):
+    """Model for persisting web search results between agent runs."""
+
+    key = models.CharField(max_length=64, unique=True)
+    query = models.CharField(max_length=500, help_text="Normalized search query")
+    search_type = models.CharField(max_length=20, default='search')
+    results = models.JSONField(default=dict, help_text="Raw Serper response")
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.query} ({self.search_type})"
+
+    class Meta:
+        verbose_name = "Search Cache Entry"
+        verbose_name_plural = "Search Cache Entries"
+
+
+"""SearchQueryLedger Model"""
+class SearchQueryLedger(models.Model):
+    """Model for remembering which results each agent has already reviewed for a query."""
+
+    agent_name = models.CharField(max_length=50)
+    query_key = models.CharField(max_length=64)
+    query = models.CharField(max_length=500, help_text="Normalized search query")
+    result_keys = models.JSONField(default=list, help_text="Identities (URL or snippet hash) of the results seen")
+    run_id = models.CharField(max_length=36, blank=True, help_text="Agent run that last issued the query")
+    run_count = models.PositiveIntegerField(default=1)
+    first_seen_at = models.DateTimeField(auto_now_add=True)
+    last_run_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.agent_name}: {self.query}"
+
+    class Meta:
+        unique_together = ('agent_name', 'query_key')
+        verbose_name = "Search Query Ledger Entry"
+        verbose_name_plural = "Search Query Ledger"
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from ..models import Company, DecisionMaker
+
+@receiver(post_save, sender=Company)
+def sync_decision_makers(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """
+    Signal to rebuild a company's DecisionMaker rows from its decision_makers JSON.
+    Skipped for fixture loading and for saves that leave decision_makers alone.
+    """
+    if raw or (update_fields is not None and 'decision_makers' not in update_fields):
+        return
+    if created and not instance.decision_makers:
+        return
+    DecisionMaker.sync(instance)
@@ -11,13 +11,20 @@ def create_outreach_for_company(sender, instance, created, **kwargs):
     """
     if created:
         template = Email.objects.filter(is_default=True).first()
-        
-        default_outreach_date = timezone.now().date() + timezone.timedelta(days=7)
-        
-        Outreach.objects.create(
-            company=instance,
-            status='pending',
-            email=template, 
-            outreach_date=default_outreach_date,
-            comments=f"Auto-generated outreach for {instance.company_name}"
-        )
\ No newline at end of file
+        default_outreach(instance, template).save()
+
+
+def default_outreach(company, template):
+    """
+    Unsaved pending Outreach for a new company, scheduled a week out. Also used
+    by bulk company inserts, which do not send post_save.
+    """
+    default_outreach_date = timezone.now().date() + timezone.timedelta(days=7)
+
+    return Outreach(
+        company=company,
+        status='pending',
+        email=template,
+        outreach_date=default_outreach_date,
+        comments=f"Auto-generated outreach for {company.company_name}"
+    )
\ No newline at end of file
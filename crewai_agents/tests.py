@@ -1,3 +1,107 @@
+import json
+from importlib import import_module
+
+from django.apps import apps
 from django.test import TestCase
 
-# Create your tests here.
+from .crew.tools.database_tools import CompanyUpdateTool
+from .models import Company, CompetitorTrend, Email, Outreach
+
+
+def company(name, **fields):
+    return {"company_name": name, "size": 50, "industry": "Healthcare", "location": "Dallas", **fields}
+
+
+class CompanyUpdateToolTests(TestCase):
+    def run_tool(self, data):
+        return CompanyUpdateTool().run(json.dumps(data))
+
+    def test_bad_item_does_not_fail_the_batch(self):
+        results = json.loads(self.run_tool([
+            company("Alpha Health", priority_score="high"),
+            company("Beta Clinic", revenue_growth="fast"),
+            company("Gamma Care", revenue_growth="12.5", website_url="not a website"),
+            company("Delta Labs", priority_score=8.5, notes="Hiring"),
+        ]))
+
+        self.assertEqual([result["status"] for result in results], ["error", "error", "error", "created"])
+        self.assertIn("priority_score", results[0]["error"])
+        self.assertIn("revenue_growth", results[1]["error"])
+        self.assertIn("website_url", results[2]["error"])
+        self.assertEqual(list(Company.objects.values_list("company_name", "priority_score", "notes")),
+                         [("Delta Labs", 8.5, "Hiring")])
+
+    def test_undeclared_keys_are_ignored(self):
+        self.assertEqual(self.run_tool(company("Alpha Health", decision_makers="CEO", unknown=1)),
+                         "Company created: Alpha Health")
+        self.assertEqual(Company.objects.get().decision_makers, [])
+
+    def test_typed_optional_fields_are_saved(self):
+        self.run_tool(company("Alpha Health", revenue_growth="12.5", stress_level_score=7, website_url="alpha.com",
+                              targeting_reason="High stress sector"))
+
+        saved = Company.objects.get()
+        self.assertEqual((saved.revenue_growth, saved.stress_level_score, saved.targeting_reason),
+                         (12.5, 7, "High stress sector"))
+        self.assertEqual((saved.website_url, saved.website_domain), ("https://alpha.com", "alpha.com"))
+
+    def test_website_match_updates_the_stored_company(self):
+        self.run_tool(company("Acme, LLC", website_url="https://acme.com"))
+
+        self.assertEqual(self.run_tool(company("Zeta Holdings", size=80, website_url="https://www.acme.com/about")),
+                         "Company updated: Acme, LLC")
+        self.assertEqual(list(Company.objects.values_list("company_name", "employee_size")), [("Acme, LLC", 80)])
+
+    def test_name_collision_with_another_website_is_reported(self):
+        self.run_tool(company("Acme LLC", website_url="https://acme.com"))
+
+        result = self.run_tool(company("ACME, Inc.", size=80, website_url="https://acme-dental.com"))
+
+        self.assertTrue(result.startswith("Error: Acme LLC"), result)
+        self.assertEqual(list(Company.objects.values_list("website_domain", "employee_size")), [("acme.com", 50)])
+
+    def test_later_item_with_the_same_website_replaces_an_earlier_one(self):
+        results = json.loads(self.run_tool([company("Acme", website_url="acme.com"),
+                                            company("Acme Holdings", website_url="https://acme.com")]))
+
+        self.assertEqual([result["status"] for result in results], ["error", "created"])
+        self.assertEqual(list(Company.objects.values_list("company_name", flat=True)), ["Acme Holdings"])
+
+
+class ContentHashBackfillTests(TestCase):
+    def test_duplicate_trends_are_deleted(self):
+        first, _, other = CompetitorTrend.objects.bulk_create([
+            CompetitorTrend(competitor_name="Calm Inc.", trend_description="Launched a B2B plan.", impact_level="High"),
+            CompetitorTrend(competitor_name="calm", trend_description="launched a b2b plan", impact_level="Low"),
+            CompetitorTrend(competitor_name="Calm", trend_description="Cut prices.", impact_level="Medium"),
+        ])
+
+        import_module("crewai_agents.migrations.0040_competitortrend_content_hash").backfill_trend_hashes(apps, None)
+
+        self.assertEqual(sorted(CompetitorTrend.objects.values_list("trend_id", flat=True)),
+                         sorted([first.trend_id, other.trend_id]))
+        self.assertFalse(CompetitorTrend.objects.filter(content_hash=None).exists())
+        first.impact_level = "Medium"
+        first.save()
+
+    def test_duplicate_emails_are_merged(self):
+        acme = Company.objects.create(company_name="Acme", employee_size=50, industry="Healthcare",
+                                      location="Dallas", website_url="https://acme.com", targeting_reason="")
+        Outreach.objects.filter(company=acme).delete()
+        first, second, other = Email.objects.bulk_create([
+            Email(name="First", subject="Hello", recipient="ceo@acme.com", content="Body", is_default=False),
+            Email(name="Copy", subject=" Hello ", recipient="CEO@acme.com", content="Body\r\n", is_default=True),
+            Email(name="Other", subject="Hello", recipient="cfo@acme.com", content="Body", is_default=False),
+        ])
+        outreach = Outreach.objects.create(company=acme, email=second)
+
+        import_module("crewai_agents.migrations.0041_email_content_hash").backfill_email_hashes(apps, None)
+
+        self.assertEqual(sorted(Email.objects.values_list("id", flat=True)), [first.id, other.id])
+        outreach.refresh_from_db()
+        self.assertEqual(outreach.email_id, first.id)
+        first.refresh_from_db()
+        self.assertTrue(first.is_default)
+        first.name = "Renamed"
+        first.full_clean()
+        first.save()
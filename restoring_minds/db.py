@@ -0,0 +1,52 @@
+import threading
+from collections import defaultdict
+
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+
+def pooled(alias="default"):
+    """True when the alias takes its connections from psycopg's pool (DB_POOL)."""
+    return bool(connections[alias].settings_dict.get("OPTIONS", {}).get("pool"))
+
+
+class ConnectionMetrics:
+    """
+    Database connections set up per alias in this process (a new server connection,
+    or one taken from the pool) and, for pooled aliases, the pool's own statistics
+    (size, available connections, requests, waits, errors).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(int)
+
+    def connection_opened(self, sender, connection, **kwargs):
+        with self._lock:
+            self.counters[connection.alias] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = {alias: {"opened": count} for alias, count in self.counters.items()}
+        for alias in connections:
+            if pooled(alias):
+                stats.setdefault(alias, {"opened": 0})["pool"] = connections[alias].pool.get_stats()
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+
+
+metrics = ConnectionMetrics()
+connection_created.connect(metrics.connection_opened, dispatch_uid="restoring_minds.db.connection_opened")
+
+
+def release_connections():
+    """
+    End (or start) of a unit of work outside the request cycle: connections past
+    CONN_MAX_AGE or left unusable are closed, pooled ones go back to the pool and
+    healthy persistent ones stay open for the next unit. Celery workers get the same
+    around every task from Celery's Django fixup.
+    """
+    close_old_connections()
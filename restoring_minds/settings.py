@@ -2,6 +2,7 @@ from django.urls import reverse_lazy
 from pathlib import Path
 from django.utils.translation import gettext_lazy as _
 from dotenv import load_dotenv
+import json
 import os
 from celery.schedules import crontab
 
@@ -25,6 +26,77 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# LLM response cache (TTL in seconds, 0 disables expiry/size eviction; MAX_ENTRIES is a soft cap,
+# exceeded by at most 10% per process between evictions)
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 60 * 60 * 24 * 7))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 10000))
+
+# Web search result cache (TTL in seconds, 0 disables expiry/size eviction; soft MAX_ENTRIES cap as above)
+SEARCH_CACHE_ENABLED = os.environ.get('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', 60 * 60 * 24 * 3))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 5000))
+# Search observations keep title/URL/snippet per result, drop results already seen in the run
+SEARCH_COMPACTION_ENABLED = os.environ.get('SEARCH_COMPACTION_ENABLED', 'true').lower() == 'true'
+SEARCH_OBSERVATION_CHARS = int(os.environ.get('SEARCH_OBSERVATION_CHARS', 2000))
+SEARCH_SNIPPET_CHARS = int(os.environ.get('SEARCH_SNIPPET_CHARS', 200))
+# Per-agent ledger of issued queries: later runs only see results they have not reviewed yet
+SEARCH_LEDGER_ENABLED = os.environ.get('SEARCH_LEDGER_ENABLED', 'true').lower() == 'true'
+SEARCH_LEDGER_MAX_AGE_DAYS = int(os.environ.get('SEARCH_LEDGER_MAX_AGE_DAYS', 30))
+# Competitor trends are buffered per agent run and written in bulk every TREND_BUFFER_SIZE
+# items and when the run ends; trends already stored (same normalized text) are dropped
+TREND_BUFFER_ENABLED = os.environ.get('TREND_BUFFER_ENABLED', 'true').lower() == 'true'
+TREND_BUFFER_SIZE = int(os.environ.get('TREND_BUFFER_SIZE', 20))
+
+# Token-bucket rate limits from ToolConfig.rate_limit, keyed by tool name (model name for LLM calls).
+# 'redis' shares the buckets across workers, 'local' keeps them in-process
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'redis')
+RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL', CELERY_BROKER_URL)
+RATE_LIMIT_REFRESH_SECONDS = int(os.environ.get('RATE_LIMIT_REFRESH_SECONDS', 60))
+RATE_LIMIT_BURST_SECONDS = int(os.environ.get('RATE_LIMIT_BURST_SECONDS', 10))
+
+# multi_web_search: queries accepted per call (also the size of its connection pool)
+MULTI_SEARCH_MAX_QUERIES = int(os.environ.get('MULTI_SEARCH_MAX_QUERIES', 5))
+
+# Agent pipeline: worker threads for independent stages and per-stage fan-out limits,
+# e.g. PIPELINE_STAGE_CONCURRENCY='{"decision_maker": 4}' (overrides DECISION_MAKER_WORKERS
+# for the sharded decision maker's batches when it runs in the pipeline)
+PIPELINE_MAX_WORKERS = int(os.environ.get('PIPELINE_MAX_WORKERS', 4))
+PIPELINE_STAGE_CONCURRENCY = json.loads(os.environ.get('PIPELINE_STAGE_CONCURRENCY', '{}'))
+
+# Agent mode: 'react' (text Action Inputs) or 'tools' (OpenAI tool calling with typed schemas)
+AGENT_MODE = os.environ.get('AGENT_MODE', 'react')
+
+# Agent scratchpad: steps whose observations are kept verbatim, the length older
+# observations are truncated to, and the token budget past which they are cut to one
+# line (actions and tool inputs are always kept)
+SCRATCHPAD_KEEP_LAST_STEPS = int(os.environ.get('SCRATCHPAD_KEEP_LAST_STEPS', 3))
+SCRATCHPAD_TOKEN_BUDGET = int(os.environ.get('SCRATCHPAD_TOKEN_BUDGET', 6000))
+SCRATCHPAD_OBSERVATION_CHARS = int(os.environ.get('SCRATCHPAD_OBSERVATION_CHARS', 500))
+
+# Decision maker: 'agent' walks the whole backlog in one ReAct loop, 'sharded' fans
+# out small batches of companies to short agent runs on a bounded worker pool
+DECISION_MAKER_MODE = os.environ.get('DECISION_MAKER_MODE', 'agent')
+DECISION_MAKER_BATCH_SIZE = int(os.environ.get('DECISION_MAKER_BATCH_SIZE', 1))
+DECISION_MAKER_WORKERS = int(os.environ.get('DECISION_MAKER_WORKERS', 4))
+# Companies per keyset page of the decision-maker backlog (agent observations and sharded fan-out)
+DECISION_MAKER_PAGE_SIZE = int(os.environ.get('DECISION_MAKER_PAGE_SIZE', 25))
+
+# Outreach specialist: 'agent' drafts one email per tool round trip, 'batch' loads
+# OUTREACH_BATCH_SIZE pending outreaches per query and drafts several emails per LLM call
+OUTREACH_MODE = os.environ.get('OUTREACH_MODE', 'agent')
+OUTREACH_BATCH_SIZE = int(os.environ.get('OUTREACH_BATCH_SIZE', 20))
+OUTREACH_COMPANIES_PER_CALL = int(os.environ.get('OUTREACH_COMPANIES_PER_CALL', 5))
+# Reuse cached pain-point/value-proposition paragraphs per industry and size band in batch mode
+OUTREACH_USE_FRAGMENTS = os.environ.get('OUTREACH_USE_FRAGMENTS', 'true').lower() == 'true'
+
+# Offline record/replay of OpenAI and Serper calls: 'off', 'record' or 'replay'.
+# Replay serves cassettes from CREW_CASSETTE_DIR with the given injected latency (seconds)
+CREW_CASSETTE_MODE = os.environ.get('CREW_CASSETTE_MODE', 'off')
+CREW_CASSETTE_DIR = os.environ.get('CREW_CASSETTE_DIR', os.path.join(BASE_DIR, 'cassettes'))
+CREW_REPLAY_LLM_LATENCY = float(os.environ.get('CREW_REPLAY_LLM_LATENCY', 0))
+CREW_REPLAY_SEARCH_LATENCY = float(os.environ.get('CREW_REPLAY_SEARCH_LATENCY', 0))
+
 CELERY_BEAT_SCHEDULE = {
     "market_researcher_daily": {
         "task": "myapp.tasks.run_market_researcher_scheduled",
@@ -104,6 +176,15 @@ WSGI_APPLICATION = 'restoring_minds.wsgi.application'
 #     }
 # }
 
+# Database connections are reused for DB_CONN_MAX_AGE seconds (0 closes them after every
+# request or Celery task) and checked before reuse. DB_POOL=true uses psycopg 3's connection
+# pool instead (persistent connections are then turned off)
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 300))
+DB_POOL = os.environ.get('DB_POOL', 'false').lower() == 'true'
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -112,9 +193,23 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {'min_size': DB_POOL_MIN_SIZE, 'max_size': DB_POOL_MAX_SIZE, 'timeout': DB_POOL_TIMEOUT},
+        } if DB_POOL else {},
     }
 }
 
+# Local development can run on SQLite (DB_ENGINE=sqlite3), including the LLM cache
+if os.environ.get('DB_ENGINE') == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [